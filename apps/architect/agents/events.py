@@ -0,0 +1,15 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+# Progress sink of the current run. Set by whoever follows the run (job API);
+# sub-tasks inherit it, since asyncio copies the context at task creation.
+EventSink = Callable[[Dict[str, Any]], None]
+run_events: ContextVar[Optional[EventSink]] = ContextVar("run_events", default=None)
+
+
+def emit(event: str, **data: Any) -> None:
+    """Publishes a progress event of the current run; no-op when nobody listens."""
+    sink = run_events.get()
+    if sink is not None:
+        sink({"event": event, "ts": time.time(), **data})
@@ -1,31 +1,58 @@
-from pydantic_ai import Agent, ModelSettings
+import asyncio
+import logging
+from typing import List
+from apps.architect.agents.routing import TieredAgent
+from apps.architect.domain.config import config
 from apps.architect.domain.ports import IAnalystAgent
 from apps.architect.domain.models import CadrageReport
-from apps.architect.dao.llm_client import get_llm_model
+from apps.architect.domain.sections import estimate_tokens, split_sections
+
+logger = logging.getLogger(__name__)
 
 
 class AnalystAgent(IAnalystAgent):
     """
     Real implementation using PydanticAI to interact with Ollama.
+    Long CDCs are analyzed section by section (map-reduce).
     """
     def __init__(self) -> None:
-        self.model = get_llm_model()
         self.fields = list(CadrageReport.model_fields.keys())
 
-        self._agent: Agent[None, CadrageReport] = Agent(
-            model=self.model,
+        self._agent: TieredAgent[CadrageReport] = TieredAgent(
+            task="analyst.analyze",
             output_type=CadrageReport,
-            model_settings=ModelSettings(temperature=0.0,),
+            model_settings={"temperature": 0.0},
             retries=2,
             instructions=(
                 "You are the Senior Analyst for TheArchitect. "
                 "Reason VERY briefly. "
                 "Extract needs, constraints, actors, and risks from the CDC. "
-                f"Your output MUST be a JSON object with EXACTLY these keys: {self.fields}. "
                 "If anything is unclear, add it to clarification_questions."
             ),
+            schema_hint=f"Your output MUST be a JSON object with EXACTLY these keys: {self.fields}.",
         )
 
     async def analyze(self, cdc_text: str) -> CadrageReport:
-        result = await self._agent.run(cdc_text)
-        return result.output
\ No newline at end of file
+        if estimate_tokens(cdc_text) <= config.ANALYST_SECTION_TOKENS:
+            return await self._agent.run(cdc_text)
+        return await self.analyze_sections(
+            split_sections(cdc_text, config.ANALYST_SECTION_TOKENS)
+        )
+
+    async def analyze_sections(self, sections: List[str]) -> CadrageReport:
+        """
+        Long-input mode: analyzes sections concurrently (bounded by
+        ANALYST_MAX_PARALLEL) and merges the partial reports in section order.
+        """
+        logger.info(f"📚 Long CDC: analyzing {len(sections)} sections")
+        semaphore = asyncio.Semaphore(max(1, config.ANALYST_MAX_PARALLEL))
+
+        async def analyze_one(index: int, section: str) -> CadrageReport:
+            async with semaphore:
+                prompt = f"CDC section {index + 1}/{len(sections)}:\n{section}"
+                return await self._agent.run(prompt)
+
+        partials = await asyncio.gather(
+            *(analyze_one(i, s) for i, s in enumerate(sections))
+        )
+        return CadrageReport.merge(partials)
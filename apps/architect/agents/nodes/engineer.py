@@ -1,9 +1,8 @@
-from typing import Dict
-from apps.architect.domain.models import SOLIDCode
+from apps.architect.domain.models import ADR, SOLIDCode
 
 
 class EngineerAgent:
-    async def generate_solid_code(self, adr: Dict, c4_diagram: Dict) -> SOLIDCode:
+    async def generate_solid_code(self, adr: ADR, c4_diagram: str) -> SOLIDCode:
         return SOLIDCode(
             class_name="DataValidator",
             methods={"validate": "def validate(self, data): return True"},
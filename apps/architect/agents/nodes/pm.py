@@ -1,53 +1,69 @@
-from typing import List, Dict, Any
-from pydantic_ai import Agent, ModelSettings
-from apps.architect.dao.llm_client import get_llm_model
+from typing import TYPE_CHECKING, List, Dict, Any
+from apps.architect.agents.routing import TieredAgent
 from apps.architect.dto.contracts import PMAnalysisReport
 from apps.architect.domain.models import TechnicalSpec
 
+if TYPE_CHECKING:
+    from pydantic_ai import ModelSettings
+
 class PMAgent:
     """
     Project Manager Agent using PydanticAI.
     Ensures strict JSON output matching domain models.
+    Each task is routed to the model tier set in its profile.
     """
 
     def __init__(self) -> None:
-        self.model = get_llm_model()
-        self.settings = ModelSettings(temperature=0.0)
+        self.settings: "ModelSettings" = {"temperature": 0.0}
 
         # Agent for SMART validation
-        self._checker_agent = Agent(
-            model=self.model,
+        self._checker_agent: TieredAgent[PMAnalysisReport] = TieredAgent(
+            task="pm.check_requirements",
             output_type=PMAnalysisReport,
             model_settings=self.settings,
             retries=2,
             instructions=(
                 "You are a strict Project Manager. Analyze requirements using SMART criteria. "
                 "Reason VERY briefly. "
-                "If ANY detail is missing, set 'is_smart' to false. "
-                f"Output MUST be JSON with keys: {list(PMAnalysisReport.model_fields.keys())}."
-            )
+                "If ANY detail is missing, set 'is_smart' to false."
+            ),
+            schema_hint=f"Output MUST be JSON with keys: {list(PMAnalysisReport.model_fields.keys())}.",
         )
 
         # Agent for Technical Specifications
-        self._spec_agent = Agent(
-            model=self.model,
+        self._spec_agent: TieredAgent[List[TechnicalSpec]] = TieredAgent(
+            task="pm.generate_specs",
             output_type=List[TechnicalSpec],
             model_settings=self.settings,
             retries=2,
             instructions=(
                 "Generate 5 detailed technical requirements. "
-                "Reason VERY briefly. "
+                "Reason VERY briefly."
+            ),
+            schema_hint=(
                 "Each item must strictly follow the TechnicalSpec schema: "
                 f"{list(TechnicalSpec.model_fields.keys())}."
-            )
+            ),
+        )
+
+        # Specialized agent for list of strings
+        self._hypothesis_agent: TieredAgent[List[str]] = TieredAgent(
+            task="pm.fill_gaps_with_hypotheses",
+            output_type=List[str],
+            model_settings=self.settings,
+            retries=2,
+            instructions=(
+                "Reason VERY briefly about technical gaps, "
+                "then generate hypotheses."
+            ),
+            schema_hint="Return a JSON list of strings.",
         )
 
     async def check_requirements(self, requirements: str) -> PMAnalysisReport:
         """
         Validates raw input and maps it to PMAnalysisReport.
         """
-        result = await self._checker_agent.run(requirements)
-        report = result.output
+        report = await self._checker_agent.run(requirements)
         report.content = requirements
         return report
 
@@ -55,23 +71,10 @@ class PMAgent:
         """
         Generates formal technical specifications from validated data.
         """
-        result = await self._spec_agent.run(f"Points: {validated_data}")
-        return result.output
+        return await self._spec_agent.run(f"Points: {validated_data}")
 
     async def fill_gaps_with_hypotheses(self, report: PMAnalysisReport) -> List[str]:
         """
         Generates technical assumptions for missing information gaps.
         """
-        # Specialized agent for list of strings
-        agent = Agent(
-            model=self.model,
-            output_type=List[str],
-            model_settings=self.settings,
-            retries=2,
-            instructions=(
-                "Reason VERY briefly about technical gaps, "
-                "then generate hypotheses. Return a JSON list of strings."
-            )
-        )
-        result = await agent.run(f"Gaps: {report.gaps}")
-        return result.output
\ No newline at end of file
+        return await self._hypothesis_agent.run(f"Gaps: {report.gaps}")
@@ -1,6 +1,7 @@
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, Union
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Union, Callable, Awaitable, TypeVar
 
 from pydantic_graph import BaseNode, End, Graph, GraphRunContext
 
@@ -10,6 +11,9 @@ from apps.architect.agents.nodes.analyst import AnalystAgent
 from apps.architect.agents.nodes.architect import ArchitectAgent
 from apps.architect.agents.nodes.engineer import EngineerAgent
 
+from apps.architect.dao.node_cache import node_cache
+from apps.architect.domain.config import config
+from apps.architect.domain.models import ArchitectureSpecs, CadrageReport, SOLIDCode
 from apps.architect.dto.contracts import PMAnalysisReport
 
 # --- State Definition ---
@@ -18,16 +22,101 @@ from apps.architect.dto.contracts import PMAnalysisReport
 class AgentState:
     """
     State of the workflow, migrated from TypedDict to Dataclass for Pydantic Graph.
-    Maintains all original fields for functional parity.
+    Nodes store the typed agent outputs as is: they are serialized once,
+    at the API edge (or by the checkpoint persistence).
     """
     requirements: str
-    charter_data: Optional[Dict[str, Any]] = None
-    analysis_report: Optional[Dict[str, Any]] = None
-    architecture_specs: Optional[Dict[str, Any]] = None
-    final_code: Optional[Dict[str, Any]] = None
+    charter_data: Optional[PMAnalysisReport] = None
+    analysis_report: Optional[CadrageReport] = None
+    architecture_specs: Optional[ArchitectureSpecs] = None
+    final_code: Optional[SOLIDCode] = None
     is_ready: bool = False
     retry_count: int = 0
     latest_error: Optional[str] = None
+    # Nodes served from the node cache vs. executed during this run
+    reused_nodes: List[str] = field(default_factory=list)
+    recomputed_nodes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class WorkflowDeps:
+    """
+    Per-run dependencies, never checkpointed.
+    Holds sub-tasks fanned out ahead of the node that consumes them, so
+    independent LLM calls overlap instead of running back to back.
+    """
+    prefetched: Dict[str, asyncio.Task] = field(default_factory=dict)
+
+    def prefetch(self, key: str, factory: Callable[[], Awaitable[Any]]) -> None:
+        """Starts a sub-task now; its consumer joins it later with take()."""
+        if key not in self.prefetched:
+            self.prefetched[key] = asyncio.ensure_future(factory())
+
+    async def take(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Joins a prefetched sub-task, or computes it inline if none was started."""
+        task = self.prefetched.pop(key, None)
+        if task is None:
+            return await factory()
+        return await task
+
+    def cancel_pending(self) -> None:
+        """Cancels fanned-out work nobody joined (e.g. the run ended early)."""
+        for task in self.prefetched.values():
+            if task.done() and not task.cancelled():
+                task.exception()  # mark as retrieved, the run already failed or ended
+            task.cancel()
+        self.prefetched.clear()
+
+
+T = TypeVar("T")
+
+_agents: Dict[type, Any] = {}
+
+
+def _shared(agent_cls: Callable[[], T]) -> T:
+    """
+    Agents are built on the first run and shared by the following ones:
+    their models, output schemas and HTTP clients are set up once per process.
+    """
+    agent = _agents.get(agent_cls)
+    if agent is None:
+        agent = _agents[agent_cls] = agent_cls()
+    return agent
+
+
+def _deps(ctx: GraphRunContext[AgentState, WorkflowDeps]) -> WorkflowDeps:
+    # Graph runs started without deps don't fan out (see PMNode): empty deps compute inline
+    return ctx.deps if ctx.deps is not None else WorkflowDeps()
+
+
+def _cache_key(node: str, inputs: Any) -> str:
+    # The models are part of the inputs: switching them invalidates the outputs
+    return node_cache.key(node, [inputs, config.SMALL_MODEL_NAME, config.MODEL_NAME])
+
+
+async def _memoized(
+    ctx: GraphRunContext[AgentState, WorkflowDeps],
+    node: str,
+    inputs: Any,
+    compute: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the state updates of a node, from the node cache when the same
+    inputs were already processed. compute() returns None for outputs that
+    must not be cached (e.g. an invalid LLM answer). The cache may be the
+    shared SQLite one: its calls run in a thread, off the event loop.
+    """
+    key = _cache_key(node, inputs)
+    updates = await asyncio.to_thread(node_cache.get, key)
+    if updates is not None:
+        ctx.state.reused_nodes.append(node)
+        return updates
+
+    updates = await compute()
+    if updates is not None:
+        await asyncio.to_thread(node_cache.put, key, updates)
+    ctx.state.recomputed_nodes.append(node)
+    return updates
 
 # --- Node Definitions ---
 
@@ -38,75 +127,102 @@ EngineerNodeReturnValue = Union['ReviewerNode', End[None]]
 
 
 @dataclass
-class PMNode(BaseNode[AgentState, Any, None]):
+class PMNode(BaseNode[AgentState, WorkflowDeps, None]):
     """
     Handles requirements validation using the PM Agent.
     Strict type checking ensures compatibility with the agentic workflow.
     """
-    async def run(self, ctx: GraphRunContext[AgentState]) -> PMNodeReturnValue:
-        agent = PMAgent()
+    async def run(self, ctx: GraphRunContext[AgentState, WorkflowDeps]) -> PMNodeReturnValue:
+        requirements = ctx.state.requirements
+
+        # Fan-out: the Analyst only reads the requirements, start it alongside the PM.
+        # Without deps nothing would join or cancel it: the Analyst then runs inline
+        analysis_key = _cache_key("AnalystNode", requirements)
+        if ctx.deps is not None and not await asyncio.to_thread(node_cache.__contains__, analysis_key):
+            ctx.deps.prefetch("analysis", lambda: _shared(AnalystAgent).analyze(requirements))
+
+        updates = await _memoized(ctx, "PMNode", requirements, lambda: self._check(requirements))
+        if updates is None:
+            return End(None)
+
+        ctx.state.charter_data = updates["charter_data"]
+        ctx.state.is_ready = True
         
+        return AnalystNode()
+
+    async def _check(self, requirements: str) -> Optional[Dict[str, Any]]:
+        agent = _shared(PMAgent)
+
         # Direct execution: exceptions will propagate and stop the graph if they occur
-        report = await agent.check_requirements(ctx.state.requirements)
+        report = await agent.check_requirements(requirements)
         
         # Type guard to handle non-deterministic LLM outputs in CI
         if not isinstance(report, PMAnalysisReport):
             logging.error(f"Invalid output format received: {type(report)}")
-            return End(None)
+            return None
 
         # Logic for non-SMART requirements
         if not report.is_smart:
             # Pass the full report object to satisfy Pyright signature requirements
             report.hypotheses = await agent.fill_gaps_with_hypotheses(report)
 
-        # Update state using standardized model dumping
-        ctx.state.charter_data = report.model_dump()
-        ctx.state.is_ready = True
-        
-        return AnalystNode()
+        return {"charter_data": report}
 
 @dataclass
-class AnalystNode(BaseNode[AgentState, Any, None]):
+class AnalystNode(BaseNode[AgentState, WorkflowDeps, None]):
     """Analyst Agent: Performs data discovery."""
-    async def run(self, ctx: GraphRunContext[AgentState]) -> AnalystNodeReturnValue:
-        agent = AnalystAgent()
-        report = await agent.analyze(ctx.state.requirements)
-        ctx.state.analysis_report = report.model_dump()
+    async def run(self, ctx: GraphRunContext[AgentState, WorkflowDeps]) -> AnalystNodeReturnValue:
+        requirements = ctx.state.requirements
+
+        async def analyze() -> Dict[str, Any]:
+            # Join the analysis fanned out by PMNode
+            report = await _deps(ctx).take("analysis", lambda: _shared(AnalystAgent).analyze(requirements))
+            return {"analysis_report": report}
+
+        updates = await _memoized(ctx, "AnalystNode", requirements, analyze)
+        ctx.state.analysis_report = updates["analysis_report"]
         return ArchitectNode()
 
 @dataclass
-class ArchitectNode(BaseNode[AgentState, Any, None]):
+class ArchitectNode(BaseNode[AgentState, WorkflowDeps, None]):
     """Architect Agent: Generates C4 diagrams and ADRs."""
-    async def run(self, ctx: GraphRunContext[AgentState]) -> ArchitectNodeReturnValue:
-        agent = ArchitectAgent()
-        # Assuming existing methods are migrated to async
-        diagram = await agent.generate_c4_diagram({"req": ctx.state.requirements})
-        adr = await agent.generate_adr({"context": "Local Deployment"})
-
-        ctx.state.architecture_specs = {
-            "diagram": diagram,
-            "adr": adr.model_dump(),
-        }
+    async def run(self, ctx: GraphRunContext[AgentState, WorkflowDeps]) -> ArchitectNodeReturnValue:
+        requirements = ctx.state.requirements
+
+        async def design() -> Dict[str, Any]:
+            agent = _shared(ArchitectAgent)
+            # Diagram and ADR are independent: run them concurrently
+            diagram, adr = await asyncio.gather(
+                agent.generate_c4_diagram({"req": requirements}),
+                agent.generate_adr({"context": "Local Deployment"}),
+            )
+            return {"architecture_specs": ArchitectureSpecs(diagram=diagram, adr=adr)}
+
+        updates = await _memoized(ctx, "ArchitectNode", requirements, design)
+        ctx.state.architecture_specs = updates["architecture_specs"]
         return EngineerNode()
 
 @dataclass
-class EngineerNode(BaseNode[AgentState, Any, None]):
+class EngineerNode(BaseNode[AgentState, WorkflowDeps, None]):
     """Engineer Agent: Generates SOLID-compliant code."""
-    async def run(self, ctx: GraphRunContext[AgentState]) -> EngineerNodeReturnValue:
-        agent = EngineerAgent()
+    async def run(self, ctx: GraphRunContext[AgentState, WorkflowDeps]) -> EngineerNodeReturnValue:
         specs = ctx.state.architecture_specs
 
         if not specs:
             raise ValueError("Critical Error: Missing architecture specs for Engineer Agent.")
 
-        code = await agent.generate_solid_code(specs["adr"], specs["diagram"])
-        ctx.state.final_code = code.model_dump()
+        async def implement() -> Dict[str, Any]:
+            code = await _shared(EngineerAgent).generate_solid_code(specs.adr, specs.diagram)
+            return {"final_code": code}
+
+        updates = await _memoized(ctx, "EngineerNode", specs, implement)
+        ctx.state.final_code = updates["final_code"]
         return ReviewerNode()
 
 @dataclass
-class ReviewerNode(BaseNode[AgentState, Any, None]):
+class ReviewerNode(BaseNode[AgentState, WorkflowDeps, None]):
     """Critiques the proposed solution based on 'Less is More' principle."""
-    async def run(self, ctx: GraphRunContext[AgentState]) -> End:
+    async def run(self, ctx: GraphRunContext[AgentState, WorkflowDeps]) -> End:
         # Objective review logic placeholder
         return End(None)
 
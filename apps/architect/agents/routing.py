@@ -0,0 +1,223 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from apps.architect.agents.events import emit
+from apps.architect.dao.llm_client import get_llm_model
+from apps.architect.domain.config import config, SMALL_TIER, LARGE_TIER
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent, ModelSettings
+
+logger = logging.getLogger(__name__)
+
+OutputT = TypeVar("OutputT")
+
+
+# --- Latency Reporting ---
+
+@dataclass
+class StepLatency:
+    """Aggregated latency and generation cost of one task on one tier."""
+    task: str
+    tier: str
+    model: str
+    output_mode: str
+    calls: int = 0
+    failures: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def avg_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+    @property
+    def retry_rate(self) -> float:
+        """Extra model requests (validation retries) per successful call."""
+        succeeded = self.calls - self.failures
+        return (self.requests - succeeded) / succeeded if succeeded else 0.0
+
+    @property
+    def avg_output_tokens(self) -> float:
+        succeeded = self.calls - self.failures
+        return self.output_tokens / succeeded if succeeded else 0.0
+
+
+class LatencyTracker:
+    """
+    Collects per-step latency for each model tier and output mode, with
+    the retry rate and tokens generated per call.
+    Every call is logged, aggregates are available through report().
+    """
+
+    def __init__(self) -> None:
+        self._steps: Dict[Tuple[str, str, str], StepLatency] = {}
+
+    def record(
+        self,
+        task: str,
+        tier: str,
+        model: str,
+        elapsed: float,
+        ok: bool,
+        output_mode: str = "tool",
+        requests: int = 0,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        step = self._steps.setdefault(
+            (task, tier, output_mode), StepLatency(task, tier, model, output_mode)
+        )
+        step.calls += 1
+        step.failures += 0 if ok else 1
+        step.total_s += elapsed
+        step.max_s = max(step.max_s, elapsed)
+        step.requests += requests
+        step.input_tokens += input_tokens
+        step.output_tokens += output_tokens
+        logger.info(
+            f"⏱️ {task} [{tier}:{model}/{output_mode}] {elapsed:.2f}s "
+            f"{requests} req {output_tokens} tok {'ok' if ok else 'failed'}"
+        )
+
+    def steps(self) -> List[StepLatency]:
+        return list(self._steps.values())
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "task": s.task,
+                "tier": s.tier,
+                "model": s.model,
+                "output_mode": s.output_mode,
+                "calls": s.calls,
+                "failures": s.failures,
+                "avg_s": round(s.avg_s, 3),
+                "max_s": round(s.max_s, 3),
+                "retry_rate": round(s.retry_rate, 3),
+                "avg_output_tokens": round(s.avg_output_tokens, 1),
+            }
+            for s in self._steps.values()
+        ]
+
+    def reset(self) -> None:
+        self._steps.clear()
+
+
+latency_tracker = LatencyTracker()
+
+
+# --- Tiered Agent ---
+
+def _run_usage(result: Any) -> Any:
+    """Usage of an agent run: a property in newer pydantic-ai, a method in the pinned 1.x."""
+    usage = result.usage
+    return usage() if callable(usage) else usage
+
+
+class TieredAgent(Generic[OutputT]):
+    """
+    PydanticAI agent routed to the model tier configured for its task.
+    Small-tier runs are escalated once to the large tier when the
+    output still fails validation after the small-tier retries.
+
+    With STRUCTURED_OUTPUT="native" the output schema is enforced by
+    constrained decoding, so the schema_hint is left out of the prompt.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        output_type: Any,
+        instructions: str,
+        model_settings: Optional["ModelSettings"] = None,
+        retries: int = 2,
+        small_retries: int = 0,
+        schema_hint: str = "",
+    ) -> None:
+        self.task = task
+        self.output_type = output_type
+        self.instructions = instructions
+        self.schema_hint = schema_hint
+        self.model_settings = model_settings or {"temperature": 0.0}
+        self.retries = retries
+        self.small_retries = small_retries
+        self._agents: Dict[Tuple[str, str, bool], "Agent[None, OutputT]"] = {}
+
+    @property
+    def tier(self) -> str:
+        return config.tier_for(self.task)
+
+    @property
+    def native(self) -> bool:
+        return config.STRUCTURED_OUTPUT == "native"
+
+    def _agent(self, tier: str) -> "Agent[None, OutputT]":
+        """
+        Builds the agent of a tier on first use (pydantic-ai and the model
+        client are only imported then); rebuilt if the model or mode changes.
+        """
+        key = (tier, config.model_for_tier(tier), self.native)
+        if key not in self._agents:
+            from pydantic_ai import Agent, NativeOutput
+
+            instructions = self.instructions
+            if self.schema_hint and not self.native:
+                instructions = f"{instructions} {self.schema_hint}"
+            self._agents[key] = Agent(
+                model=get_llm_model(config.model_for_tier(tier)),
+                output_type=NativeOutput(self.output_type) if self.native else self.output_type,
+                model_settings=self.model_settings,
+                retries=self.small_retries if tier == SMALL_TIER else self.retries,
+                instructions=instructions,
+            )
+        return self._agents[key]
+
+    async def run(self, prompt: str) -> OutputT:
+        from pydantic_ai.exceptions import UnexpectedModelBehavior
+
+        tier = self.tier
+        try:
+            return await self._run_on(tier, prompt)
+        except UnexpectedModelBehavior as e:
+            if tier != SMALL_TIER:
+                raise
+            logger.warning(f"⚠️ {self.task}: small tier output rejected ({e}), escalating")
+            return await self._run_on(LARGE_TIER, prompt)
+
+    async def _run_on(self, tier: str, prompt: str) -> OutputT:
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await self._agent(tier).run(prompt)
+            return result.output
+        finally:
+            usage = _run_usage(result) if result is not None else None
+            elapsed = time.perf_counter() - start
+            input_tokens = (usage.input_tokens or 0) if usage else 0
+            output_tokens = (usage.output_tokens or 0) if usage else 0
+            latency_tracker.record(
+                self.task,
+                tier,
+                config.model_for_tier(tier),
+                elapsed,
+                ok=result is not None,
+                output_mode="native" if self.native else "tool",
+                requests=usage.requests if usage else 0,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+            emit(
+                "tokens",
+                task=self.task,
+                model=config.model_for_tier(tier),
+                ok=result is not None,
+                duration_s=elapsed,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from starlette.requests import HTTPConnection
+
+from apps.architect.api.metrics import ADMISSION_REJECTIONS, RUNS_WAITING
+from apps.architect.dao.rate_limits import SharedTokenBuckets
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = "rate_limited"
+OVERLOADED = "overloaded"
+
+
+class AdmissionRejected(Exception):
+    """A new run was turned away; the client should retry after `retry_after_s`."""
+
+    def __init__(self, reason: str, retry_after_s: float) -> None:
+        self.reason = reason
+        self.retry_after_s = max(1, math.ceil(retry_after_s))
+        super().__init__(f"Busy, retry in {self.retry_after_s}s")
+
+
+def client_key(request: HTTPConnection) -> str:
+    """
+    Client identity for the per-client rate limit. Proxies append the peer
+    they received the request from to X-Forwarded-For, so only the last
+    TRUSTED_PROXY_HOPS entries can be trusted (earlier ones come from the
+    client): the client is the entry the outermost trusted proxy appended,
+    else the peer address.
+    """
+    hops = config.TRUSTED_PROXY_HOPS
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if hops > 0 and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; one token per run."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class AdmissionController:
+    """
+    Admission of new pipeline runs in front of a single Ollama.
+    Entry points call `check` and reject at once when the client exceeds its
+    token bucket or when the estimated queue wait is over MAX_QUEUE_WAIT_S;
+    every run then executes in a `slot`, at most MAX_CONCURRENT_RUNS at once.
+    The wait is estimated from the runs ahead and the recent run durations.
+    In multi-worker mode each worker process has its share of the slots
+    (MAX_CONCURRENT_RUNS / WORKERS) and the token buckets are shared
+    through the state database.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        rate_per_min: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_wait_s: Optional[float] = None,
+        max_clients: int = 10_000,
+        shared_buckets: Optional[SharedTokenBuckets] = None,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent or config.MAX_CONCURRENT_RUNS // max(1, config.WORKERS))
+        self.rate = (rate_per_min if rate_per_min is not None else config.RATE_LIMIT_PER_MIN) / 60
+        self.burst = max(1, burst or config.RATE_LIMIT_BURST)
+        self.max_wait_s = max_wait_s if max_wait_s is not None else config.MAX_QUEUE_WAIT_S
+        self.max_clients = max_clients
+        self.run_estimate_s = config.RUN_ESTIMATE_S
+        self.running = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.shared_buckets = shared_buckets
+
+    # --- Admission ---
+    def estimated_wait(self, backlog: int = 0) -> float:
+        """Seconds before a new run starts, `backlog` runs queued elsewhere included."""
+        ahead = self.running + self.waiting + backlog
+        if ahead < self.max_concurrent:
+            return 0.0
+        return (ahead - self.max_concurrent + 1) / self.max_concurrent * self.run_estimate_s
+
+    def _bucket(self, client: str) -> TokenBucket:
+        bucket = self._buckets.pop(client, None) or TokenBucket(self.rate, self.burst)
+        self._buckets[client] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    async def _take(self, client: str) -> float:
+        if self.shared_buckets is None:
+            return self._bucket(client).take()
+        return await asyncio.to_thread(self.shared_buckets.take, client, self.rate, self.burst)
+
+    async def check(self, client: str, backlog: int = 0) -> None:
+        """Raises AdmissionRejected, or admits the run (it still waits for a slot)."""
+        wait = self.estimated_wait(backlog)
+        if wait > self.max_wait_s:
+            self._reject(client, OVERLOADED, wait - self.max_wait_s)
+        if self.rate > 0:
+            retry = await self._take(client)
+            if retry:
+                self._reject(client, RATE_LIMITED, retry)
+
+    def _reject(self, client: str, reason: str, retry_after_s: float) -> None:
+        ADMISSION_REJECTIONS.labels(reason).inc()
+        error = AdmissionRejected(reason, retry_after_s)
+        logger.warning(f"🚦 Run of {client} rejected ({reason}), retry in {error.retry_after_s}s")
+        raise error
+
+    # --- Execution ---
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Waits for one of the MAX_CONCURRENT_RUNS slots; completed runs refine the estimate."""
+        self.waiting += 1
+        RUNS_WAITING.inc()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+            RUNS_WAITING.dec()
+        self.running += 1
+        start = time.monotonic()
+        try:
+            yield
+            # Moving average of completed runs: cancelled or failed ones say little
+            self.run_estimate_s = 0.8 * self.run_estimate_s + 0.2 * (time.monotonic() - start)
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+
+admission = AdmissionController(
+    shared_buckets=SharedTokenBuckets() if config.STATE_BACKEND == "sqlite" else None
+)
@@ -0,0 +1,184 @@
+"""
+Batch mode: runs the agentic pipeline over a JSONL of requirements.
+
+Usage:
+python -m apps.architect.api.batch requirements.jsonl results.jsonl --concurrency 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from typing import AsyncIterator, Iterable, List, Optional, Set
+
+from pydantic import ValidationError
+
+from apps.architect.agents.orchestrator import app_workflow
+from apps.architect.api.controller import ArchitectController
+from apps.architect.dao.checkpoints import checkpoints
+from apps.architect.domain.config import config
+from apps.architect.dto.contracts import ArchitectureRequest, BatchItem
+from apps.architect.dto.states import BatchResultDTO
+
+logger = logging.getLogger(__name__)
+
+
+def parse_items(lines: Iterable[str]) -> List[BatchItem]:
+    """Parses JSONL input; ids default to the 1-based line number."""
+    items = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        item = BatchItem.model_validate_json(line)
+        items.append(item if item.id else item.model_copy(update={"id": str(number)}))
+    return items
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Ids already processed successfully, read back from an existing output (resume)."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = BatchResultDTO.model_validate_json(line)
+            except ValidationError:
+                continue  # Truncated last line of an interrupted batch
+            if result.status == "ok":
+                done.add(result.id)
+    return done
+
+
+def trim_partial_line(output_path: str) -> None:
+    """Cuts the truncated last line of an interrupted batch, so appended results start on their own line."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                position += newline + 1 - step
+                break
+            position -= step
+        if position < end:
+            f.truncate(position)
+
+
+class BatchRunner:
+    """
+    Runs graph executions with at most `concurrency` in flight and yields
+    each result as soon as it finishes (completion order, not input order).
+    Run ids (checkpoints, history) are scoped to the batch: `scope` defaults
+    to a random id, run_file uses the output file so a rerun resumes.
+    """
+
+    def __init__(
+        self,
+        controller: Optional[ArchitectController] = None,
+        concurrency: Optional[int] = None,
+        scope: Optional[str] = None,
+    ) -> None:
+        self.controller = controller or ArchitectController()
+        self.concurrency = max(1, concurrency or config.BATCH_CONCURRENCY)
+        self.scope = scope or uuid.uuid4().hex[:12]
+
+    def run_id(self, item: BatchItem) -> str:
+        # Ids default to line numbers: the requirements hash tells items apart across inputs
+        return f"batch-{self.scope}-{item.id}-{_digest(item.requirements)}"
+
+    async def _resumable(self, run_id: str, item: BatchItem) -> bool:
+        """Whether the item has a checkpoint of these very requirements to resume."""
+        if not checkpoints.exists(run_id):
+            return False
+        if await checkpoints.requirements(run_id, app_workflow) == item.requirements:
+            return True
+        logger.warning(f"⚠️ Checkpoint {run_id} holds other requirements, starting over")
+        checkpoints.discard(run_id)
+        return False
+
+    async def _run_one(self, item: BatchItem) -> BatchResultDTO:
+        start = time.perf_counter()
+        # Items interrupted mid-graph restart at their failed node, not from scratch
+        run_id = self.run_id(item)
+        try:
+            if await self._resumable(run_id, item):
+                state = await self.controller.resume_pipeline(run_id, partial=False)
+            else:
+                state = await self.controller.run_full_pipeline(
+                    ArchitectureRequest(requirements=item.requirements), run_id=run_id, partial=False
+                )
+            return BatchResultDTO(
+                id=item.id, status="ok", duration_s=time.perf_counter() - start, result=state
+            )
+        except Exception as e:
+            logger.error(f"Batch item {item.id} failed: {e}")
+            return BatchResultDTO(
+                id=item.id, status="failed", duration_s=time.perf_counter() - start,
+                error=str(e) or type(e).__name__,
+            )
+
+    async def run(self, items: List[BatchItem]) -> AsyncIterator[BatchResultDTO]:
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker() -> None:
+            while not queue.empty():
+                item = queue.get_nowait()
+                await results.put(await self._run_one(item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(items)))]
+        try:
+            for _ in items:
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def run_file(self, input_path: str, output_path: str) -> int:
+        """Processes a JSONL file, appending results and skipping completed ids."""
+        self.scope = _digest(os.path.abspath(output_path))
+        with open(input_path, "r", encoding="utf-8") as f:
+            items = parse_items(f)
+        done = completed_ids(output_path)
+        pending = [item for item in items if item.id not in done]
+        logger.info(f"📦 Batch: {len(pending)} to run, {len(done)} already completed")
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        trim_partial_line(output_path)
+        count = 0
+        with open(output_path, "a", encoding="utf-8") as out:
+            async for result in self.run(pending):
+                out.write(result.model_dump_json() + "\n")
+                out.flush()
+                count += 1
+                logger.info(f"✅ [{count}/{len(pending)}] {result.id}: {result.status}")
+        return count
+
+
+# --- CLI ---
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the agentic pipeline over a JSONL batch.")
+    parser.add_argument("input", help="JSONL with one {\"id\", \"requirements\"} per line.")
+    parser.add_argument("output", help="JSONL results, appended to and used to resume.")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(BatchRunner(concurrency=args.concurrency).run_file(args.input, args.output))
+
+
+if __name__ == "__main__":
+    main()
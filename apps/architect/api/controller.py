@@ -1,23 +1,214 @@
-from typing import Dict, Any
-from apps.architect.agents.orchestrator import app_workflow, PMNode, AgentState
-from apps.architect.dto.contracts import ArchitectureRequest
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic_graph import End, GraphRun
+from apps.architect.agents.events import emit
+from apps.architect.dao.checkpoints import checkpoints
+from apps.architect.dao.ollama_admin import model_keeper
+from apps.architect.dao.run_history import run_history
+from apps.architect.agents.orchestrator import app_workflow, PMNode, AgentState, WorkflowDeps
+from apps.architect.api.admission import admission
+from apps.architect.api.observability import run_span
+from apps.architect.api.profiling import RunProfiler, should_profile
+from apps.architect.api.metrics import NODE_DURATION, PIPELINE_DURATION, PIPELINE_RUNS, RUNS_IN_FLIGHT
+from apps.architect.domain.config import LARGE_TIER, SMALL_TIER, config
+from apps.architect.dto.contracts import ArchitectureRequest, PMAnalysisReport
 from apps.architect.dto.states import AgentStateDTO
 
+logger = logging.getLogger(__name__)
+
+RunFactory = Callable[[WorkflowDeps], AbstractAsyncContextManager[GraphRun]]
+
 
 class ArchitectController:
-    """Handles the logic execution for the UI."""
+    """
+    Handles the logic execution for the UI.
+    Runs are bounded by a deadline and cooperatively cancellable: cancelling
+    the awaiting task (e.g. the client left) cancels the graph, its fanned-out
+    sub-tasks and the in-flight HTTP requests to Ollama.
+    """
 
-    async def run_full_pipeline(self, request: ArchitectureRequest) -> Dict[str, Any]:
+    async def run_full_pipeline(
+        self,
+        request: ArchitectureRequest,
+        run_id: Optional[str] = None,
+        deadline_s: Optional[float] = None,
+        partial: Optional[bool] = None,
+    ) -> AgentStateDTO:
+        """Runs the graph from the PM node, checkpointing after every node under run_id."""
+        run_id = run_id or uuid.uuid4().hex
+        persistence = checkpoints.open(run_id, app_workflow)
         internal_state = AgentState(requirements=request.requirements)
-        
-        result = await app_workflow.run(PMNode(), state=internal_state)
+        return await self._execute(
+            run_id,
+            lambda deps: app_workflow.iter(
+                PMNode(), state=internal_state, deps=deps, persistence=persistence
+            ),
+            deadline_s,
+            partial,
+            request.profile,
+        )
+
+    async def resume_pipeline(
+        self,
+        run_id: str,
+        deadline_s: Optional[float] = None,
+        partial: Optional[bool] = None,
+        profile: bool = False,
+    ) -> AgentStateDTO:
+        """Restarts an interrupted run at the node that failed; completed nodes are not re-run."""
+        if not checkpoints.exists(run_id):
+            raise KeyError(f"No checkpoint for run {run_id}")
+        persistence = checkpoints.open(run_id, app_workflow)
+        logger.info(f"⏯️ Resuming run {run_id}")
+        return await self._execute(
+            run_id,
+            lambda deps: app_workflow.iter_from_persistence(persistence, deps=deps),
+            deadline_s,
+            partial,
+            profile,
+        )
+
+    async def _execute(
+        self,
+        run_id: str,
+        start_run: RunFactory,
+        deadline_s: Optional[float],
+        partial: Optional[bool],
+        profile: bool = False,
+    ) -> AgentStateDTO:
+        deadline_s = deadline_s if deadline_s is not None else config.RUN_DEADLINE_S
+        partial = partial if partial is not None else config.PARTIAL_ON_DEADLINE
 
+        # Traffic keeps the models pinned (and reloads them after an idle release)
+        model_keeper.touch()
+        deps = WorkflowDeps()
+
+        start: Optional[float] = None  # set once the run holds a slot
+        status = "failed"
+        internal_state: Optional[AgentState] = None
+        result: Optional[AgentStateDTO] = None
+        error: Optional[str] = None
+        timings: List[Dict[str, Any]] = []
+        profile_path: Optional[str] = None
+        # Sampling profile of this run, when requested or sampled (nothing otherwise)
+        profiler = RunProfiler(run_id) if should_profile(profile) else None
+        # Root span of the run: its trace is sampled as a whole
+        with run_span(run_id) as finish_span:
+            if profiler is not None:
+                profiler.start()
+            try:
+                # Runs beyond MAX_CONCURRENT_RUNS wait here, before their deadline starts
+                async with admission.slot(), start_run(deps) as run:
+                    # In flight and timed from here: the queue wait is architect_runs_waiting
+                    RUNS_IN_FLIGHT.inc()
+                    start = time.perf_counter()
+                    internal_state = run.state
+                    deadline = asyncio.timeout(deadline_s)
+                    try:
+                        async with deadline:
+                            await self._run_graph(run, timings)
+                        status = "success"
+                    except TimeoutError:
+                        if not deadline.expired():
+                            raise  # raised by a node, not by the deadline
+                        status = "timeout"
+                        logger.warning(f"⏱️ Run {run_id} exceeded its {deadline_s}s deadline")
+                        if not partial:
+                            raise
+                result = self._to_dto(run_id, internal_state, partial=status != "success")
+            except asyncio.CancelledError:
+                status = "cancelled"
+                logger.info(f"🛑 Run {run_id} cancelled, resumable from its last checkpoint")
+                raise
+            except BaseException as e:
+                error = str(e) or type(e).__name__
+                logger.error(f"❌ Run {run_id} interrupted, resumable from its last checkpoint")
+                raise
+            finally:
+                # Abandoned sub-tasks must not keep the models busy
+                deps.cancel_pending()
+                if profiler is not None:
+                    profiler.stop()
+                    profile_path = await asyncio.to_thread(profiler.write)
+                duration = time.perf_counter() - start if start is not None else 0.0
+                PIPELINE_RUNS.labels(status).inc()
+                if start is not None:
+                    RUNS_IN_FLIGHT.dec()
+                    PIPELINE_DURATION.observe(duration)
+                finish_span(status, profile_path)
+                if internal_state is not None:
+                    await self._archive(
+                        run_id, status, internal_state, duration, result, timings, error, profile_path
+                    )
+
+        if status == "success":
+            checkpoints.discard(run_id)
+        logger.info(
+            f"♻️ Run {run_id}: reused {internal_state.reused_nodes or 'none'}, "
+            f"recomputed {internal_state.recomputed_nodes or 'none'}"
+        )
+        return result
+
+    @staticmethod
+    def _to_dto(run_id: str, state: AgentState, partial: bool) -> AgentStateDTO:
         return AgentStateDTO(
-            requirements=result.state.requirements,
-            charter_data=result.state.charter_data or {},
-            analysis_report=result.state.analysis_report,
-            architecture_specs=result.state.architecture_specs,
-            final_code=result.state.final_code,
-            is_ready=result.state.is_ready,
-            retry_count=result.state.retry_count
-        )
\ No newline at end of file
+            run_id=run_id,
+            partial=partial,
+            requirements=state.requirements,
+            charter_data=state.charter_data or PMAnalysisReport(),
+            analysis_report=state.analysis_report,
+            architecture_specs=state.architecture_specs,
+            final_code=state.final_code,
+            is_ready=state.is_ready,
+            retry_count=state.retry_count,
+            reused_nodes=state.reused_nodes,
+            recomputed_nodes=state.recomputed_nodes,
+        )
+
+    @staticmethod
+    async def _archive(
+        run_id: str,
+        status: str,
+        state: AgentState,
+        duration: float,
+        result: Optional[AgentStateDTO],
+        timings: List[Dict[str, Any]],
+        error: Optional[str],
+        profile: Optional[str] = None,
+    ) -> None:
+        """Stores the run in the history, off the event loop; never fails the run."""
+        try:
+            await asyncio.to_thread(
+                run_history.record,
+                run_id,
+                status,
+                state.requirements,
+                config.MODEL_NAME,
+                duration,
+                result,
+                timings,
+                {SMALL_TIER: config.SMALL_MODEL_NAME, LARGE_TIER: config.MODEL_NAME},
+                error,
+                profile,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store run {run_id} in the history: {e}")
+
+    async def _run_graph(self, run: GraphRun, timings: List[Dict[str, Any]]) -> None:
+        """Steps through the graph node by node, timing each one."""
+        node = run.next_node
+        while not isinstance(node, End):
+            name = type(node).__name__
+            emit("node-started", node=name)
+            node_start = time.perf_counter()
+            next_node = await run.next(node)
+            elapsed = time.perf_counter() - node_start
+            NODE_DURATION.labels(name).observe(elapsed)
+            timings.append({"node": name, "duration_s": elapsed})
+            emit("node-finished", node=name, duration_s=elapsed)
+            node = next_node
@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar, Union
+
+from apps.architect.agents.events import run_events
+from apps.architect.api.controller import ArchitectController
+from apps.architect.dao.job_store import Job, MemoryJobStore, SqliteJobStore
+from apps.architect.domain.config import config
+from apps.architect.dto.contracts import ArchitectureRequest
+
+logger = logging.getLogger(__name__)
+
+JobStore = Union[MemoryJobStore, SqliteJobStore]
+T = TypeVar("T")
+
+
+def default_store() -> JobStore:
+    return SqliteJobStore() if config.STATE_BACKEND == "sqlite" else MemoryJobStore()
+
+
+class JobManager:
+    """
+    Runs pipelines submitted over HTTP on a pool of JOB_WORKERS background
+    tasks. Submission returns at once; clients poll the status or follow the
+    progress events. Jobs and events live in the job store: process memory,
+    or the shared SQLite database in multi-worker mode, where a job queued on
+    one worker may run on another and is tracked from any of them.
+    SQLite calls run in a single store thread, off the event loop and in
+    submission order (events keep their order, run-finished comes last).
+    """
+
+    def __init__(
+        self,
+        controller: Optional[ArchitectController] = None,
+        workers: Optional[int] = None,
+        store: Optional[JobStore] = None,
+    ) -> None:
+        self.controller = controller or ArchitectController()
+        self.workers = max(1, workers or config.JOB_WORKERS)
+        self.store = store if store is not None else default_store()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._tasks: List[asyncio.Task] = []
+        # The in-memory store lives on the event loop (asyncio queue and events)
+        self._io_thread = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+            if isinstance(self.store, SqliteJobStore) else None
+        )
+
+    # --- Store access ---
+    async def _io(self, method: Callable[..., T], *args: Any) -> T:
+        if self._io_thread is None:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._io_thread, functools.partial(method, *args)
+        )
+
+    def _publish(self, run_id: str, event: Dict[str, Any]) -> None:
+        """Fire and forget: node and token events are published from synchronous code."""
+        if self._io_thread is None:
+            self.store.publish(run_id, event)
+            return
+        self._io_thread.submit(self._store_event, run_id, event)
+
+    def _store_event(self, run_id: str, event: Dict[str, Any]) -> None:
+        try:
+            self.store.publish(run_id, event)
+        except Exception as e:
+            logger.warning(f"⚠️ Event of run {run_id} not stored: {e}")
+
+    # --- Job API ---
+    async def submit(self, request: ArchitectureRequest) -> Job:
+        return await self._enqueue(Job(run_id=uuid.uuid4().hex, request=request))
+
+    async def resume(self, run_id: str) -> Job:
+        """Queues the resumption of an interrupted run from its checkpoint."""
+        return await self._enqueue(Job(run_id=run_id, request=None, resume=True))
+
+    async def _enqueue(self, job: Job) -> Job:
+        await self._io(self.store.add, job)
+        await self._io(self.store.publish, job.run_id, {"event": "queued", "ts": job.created_at})
+        return job
+
+    async def get(self, run_id: str) -> Optional[Job]:
+        return await self._io(self.store.get, run_id)
+
+    async def queued(self) -> int:
+        """Jobs waiting for a worker, counted in the admission wait estimate."""
+        return await self._io(self.store.queued)
+
+    async def cancel(self, run_id: str) -> bool:
+        task = self._running.get(run_id)
+        if task is not None:
+            task.cancel()
+            return True
+        # A queued job is cancelled by the store, with its run-finished event
+        return await self._io(self.store.request_cancel, run_id) is not None
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        """Records the outcome of a run; a store failure is logged, the worker goes on."""
+        job.status, job.error, job.finished_at = status, error, time.time()
+        try:
+            if not await self._io(self.store.finish, job):
+                logger.warning(f"⚠️ Run {job.run_id} was no longer running, {status} not recorded")
+        except Exception as e:
+            logger.error(f"Run {job.run_id} ended {status} but was not recorded: {e}")
+
+    async def _execute(self, job: Job) -> None:
+        self._publish(job.run_id, {"event": "run-started", "ts": job.started_at})
+        # Node and token events of this run go to the store (sub-tasks included)
+        run_events.set(lambda event: self._publish(job.run_id, event))
+        if job.resume:
+            job.result = await self.controller.resume_pipeline(job.run_id)
+        else:
+            job.result = await self.controller.run_full_pipeline(job.request, run_id=job.run_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.store.claim()
+            # Own task per job: cancelling a run leaves the worker alive
+            task = self._running[job.run_id] = asyncio.create_task(self._execute(job))
+            try:
+                await task
+                await self._finish(job, "partial" if job.result.partial else "success")
+            except asyncio.CancelledError:
+                # Shielded: a worker being stopped still records the cancellation
+                await asyncio.shield(self._finish(job, "cancelled"))
+                if asyncio.current_task().cancelling():
+                    raise  # the worker itself is being stopped
+            except Exception as e:
+                logger.error(f"Run {job.run_id} failed: {e}")
+                await self._finish(job, "failed", str(e) or type(e).__name__)
+            finally:
+                self._running.pop(job.run_id, None)
+
+    async def _watch_cancellations(self) -> None:
+        """Cancels local runs whose cancellation was requested on another worker."""
+        while True:
+            await asyncio.sleep(config.JOB_POLL_S)
+            for run_id in await self._io(self.store.cancel_requested, list(self._running)):
+                if run_id in self._running:
+                    self._running[run_id].cancel()
+
+    async def _keep_leases(self) -> None:
+        """Renews the leases of local runs, and fails the runs of workers that died (SQLite store)."""
+        while True:
+            try:
+                await self._io(self.store.heartbeat)
+                for run_id in await self._io(self.store.expire_leases):
+                    logger.warning(f"⚠️ Run {run_id} failed: its worker stopped renewing its lease")
+            except Exception as e:
+                logger.warning(f"⚠️ Job leases not renewed: {e}")
+            await asyncio.sleep(self.store.lease_s / 3)
+
+    async def events(self, run_id: str, after: int = -1) -> AsyncIterator[Dict[str, Any]]:
+        """Events with an id above `after`, then live ones until the run is over."""
+        while True:
+            job = await self._io(self.store.get, run_id)
+            for event in await self._io(self.store.events_after, run_id, after):
+                after = event["id"]
+                yield event
+            # The status was read before the events, and a final status is
+            # stored with the run-finished event: none can be missed
+            if job is None or job.done:
+                return
+            await self.store.wait(run_id, after, timeout=15.0)
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._watch_cancellations()))
+        if isinstance(self.store, SqliteJobStore):
+            self._tasks.append(asyncio.create_task(self._keep_leases()))
+        logger.info(f"🧵 Job pool started with {self.workers} workers ({type(self.store).__name__})")
+
+    async def stop(self) -> None:
+        """Cancels the workers and their runs, and waits for them to unwind (archive included)."""
+        tasks = [*self._tasks, *self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def sse(event: Dict[str, Any]) -> str:
+    """Server-sent event frame; the id lets clients resume with Last-Event-ID."""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+job_manager = JobManager()
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import List, Optional, Tuple
+
+from apps.architect.api.metrics import LOOP_BLOCKS, LOOP_LAG
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+STDLIB = sysconfig.get_paths()["stdlib"]
+APP_PACKAGE = "apps."
+
+
+def _is_stdlib(filename: str) -> bool:
+    # site-packages may live under the stdlib directory (system Python, Docker images)
+    return filename.startswith("<frozen") or (
+        filename.startswith(STDLIB) and "site-packages" not in filename
+    )
+
+
+def _module(frame: FrameType) -> str:
+    return frame.f_globals.get("__name__") or "?"
+
+
+def blocking_site(frame: FrameType) -> Tuple[str, str]:
+    """
+    (module, caller) of a blocked stack: the innermost module outside the
+    standard library (e.g. the library doing the blocking I/O or compute) and
+    the innermost frame of the app, the code to move off the loop.
+    """
+    module = caller = None
+    while frame is not None:
+        if module is None and not _is_stdlib(frame.f_code.co_filename):
+            module = _module(frame)
+        if caller is None and _module(frame).startswith(APP_PACKAGE):
+            caller = f"{_module(frame)}:{frame.f_code.co_qualname}:{frame.f_lineno}"
+        frame = frame.f_back
+    return module or "?", caller or "?"
+
+
+class LoopMonitor:
+    """
+    Measures the event loop lag and reports what blocks it.
+    A task sleeps LOOP_MONITOR_INTERVAL_S and records how late it wakes up
+    (architect_event_loop_lag_seconds). A watchdog thread checks the task's
+    heartbeat: when the loop has been stuck for LOOP_BLOCK_THRESHOLD_S, it
+    captures the loop thread's stack and logs it once per blocking episode,
+    with the module doing the blocking and its caller in the app.
+    """
+
+    def __init__(self, interval_s: Optional[float] = None, threshold_s: Optional[float] = None) -> None:
+        self.interval_s = interval_s or config.LOOP_MONITOR_INTERVAL_S
+        self.threshold_s = threshold_s or config.LOOP_BLOCK_THRESHOLD_S
+        self.heartbeat = time.monotonic()
+        self.max_lag_s = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread = 0
+
+    async def _measure(self) -> None:
+        while True:
+            start = time.monotonic()
+            self.heartbeat = start
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, time.monotonic() - start - self.interval_s)
+            self.max_lag_s = max(self.max_lag_s, lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.interval_s):
+            heartbeat = self.heartbeat
+            blocked_s = time.monotonic() - heartbeat - self.interval_s
+            if blocked_s < self.threshold_s or reported == heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported = heartbeat
+            self.report(frame, blocked_s)
+
+    def report(self, frame: FrameType, blocked_s: float) -> None:
+        module, caller = blocking_site(frame)
+        LOOP_BLOCKS.labels(module).inc()
+        stack: List[str] = traceback.format_stack(frame)[-12:]
+        logger.warning(
+            f"🐢 Event loop blocked for {blocked_s:.2f}s+ in {module} (from {caller}):\n{''.join(stack)}"
+        )
+
+    async def start(self) -> None:
+        if not config.LOOP_MONITOR:
+            return
+        self._loop_thread = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,127 @@
+from typing import Iterator
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from apps.architect.agents.routing import latency_tracker
+from apps.architect.api.observability import span_stats
+from apps.architect.dao.node_cache import node_cache
+
+# Dedicated registry: only the application metrics are exposed. Metrics are
+# those of this process: in multi-worker mode every worker is scraped on its
+# own port (infra/prometheus-workers.yaml) and Prometheus aggregates them
+registry = CollectorRegistry()
+
+# LLM calls take seconds to minutes, the default buckets stop at 10s
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+# --- Pipeline (observed on the request path: plain counters, no locks held across awaits) ---
+
+PIPELINE_RUNS = Counter(
+    "architect_pipeline_runs", "Pipeline runs by final status", ["status"], registry=registry
+)
+PIPELINE_DURATION = Histogram(
+    "architect_pipeline_duration_seconds", "End-to-end pipeline latency",
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+NODE_DURATION = Histogram(
+    "architect_node_duration_seconds", "Graph node latency", ["node"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+RUNS_IN_FLIGHT = Gauge(
+    "architect_runs_in_flight", "Pipeline runs currently executing", registry=registry
+)
+RUNS_WAITING = Gauge(
+    "architect_runs_waiting", "Admitted pipeline runs waiting for a free run slot", registry=registry
+)
+ADMISSION_REJECTIONS = Counter(
+    "architect_admission_rejections", "Pipeline runs turned away at admission", ["reason"],
+    registry=registry,
+)
+LOOP_LAG = Histogram(
+    "architect_event_loop_lag_seconds", "Delay of the event loop in running a ready callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10), registry=registry,
+)
+LOOP_BLOCKS = Counter(
+    "architect_event_loop_blocks", "Event loop blocked past the threshold, by blocking module", ["module"],
+    registry=registry,
+)
+UI_SESSIONS = Gauge(
+    "architect_ui_sessions", "Connected NiceGUI clients", registry=registry
+)
+
+
+# --- LLM (collected at scrape time from the in-process trackers, zero hot-path cost) ---
+
+class LLMCollector(Collector):
+    """Exposes LatencyTracker and RepairStats aggregates when Prometheus scrapes."""
+
+    def collect(self) -> Iterator[Metric]:
+        # Imported at scrape time: output_repair loads pydantic-ai
+        from apps.architect.dao.output_repair import repair_stats
+
+        labels = ["task", "tier", "model", "output_mode"]
+        calls = CounterMetricFamily("architect_llm_calls", "LLM calls", labels=labels + ["result"])
+        seconds = CounterMetricFamily("architect_llm_seconds", "Time spent in LLM calls", labels=labels)
+        requests = CounterMetricFamily(
+            "architect_llm_requests", "Model requests, validation retries included", labels=labels
+        )
+        tokens = CounterMetricFamily("architect_llm_tokens", "LLM tokens", labels=labels + ["kind"])
+        speed = GaugeMetricFamily(
+            "architect_llm_tokens_per_second", "Completion tokens per second of LLM time", labels=labels
+        )
+
+        for step in latency_tracker.steps():
+            values = [step.task, step.tier, step.model, step.output_mode]
+            calls.add_metric(values + ["success"], step.calls - step.failures)
+            calls.add_metric(values + ["failure"], step.failures)
+            seconds.add_metric(values, step.total_s)
+            requests.add_metric(values, step.requests)
+            tokens.add_metric(values + ["prompt"], step.input_tokens)
+            tokens.add_metric(values + ["completion"], step.output_tokens)
+            speed.add_metric(values, step.output_tokens / step.total_s if step.total_s else 0.0)
+
+        repairs = CounterMetricFamily(
+            "architect_llm_outputs", "Structured outputs by handling", labels=["handling"]
+        )
+        repairs.add_metric(["received"], repair_stats.responses)
+        repairs.add_metric(["repaired"], repair_stats.repaired)
+        repairs.add_metric(["retried"], repair_stats.retries)
+
+        yield from (calls, seconds, requests, tokens, speed, repairs)
+
+
+class CacheCollector(Collector):
+    """Exposes the hit/miss counts of the in-process caches."""
+
+    def collect(self) -> Iterator[Metric]:
+        requests = CounterMetricFamily(
+            "architect_cache_requests", "Cache lookups by cache and result", labels=["cache", "result"]
+        )
+        requests.add_metric(["node", "hit"], node_cache.hits)
+        requests.add_metric(["node", "miss"], node_cache.misses)
+        entries = GaugeMetricFamily("architect_cache_entries", "Cached entries", labels=["cache"])
+        entries.add_metric(["node"], len(node_cache))
+        yield from (requests, entries)
+
+
+class TraceCollector(Collector):
+    """Exposes the span export outcomes of the batching span processor."""
+
+    def collect(self) -> Iterator[Metric]:
+        spans = CounterMetricFamily("architect_spans", "Ended spans by export outcome", labels=["result"])
+        for result, count in span_stats.snapshot().items():
+            spans.add_metric([result], count)
+        yield spans
+
+
+registry.register(LLMCollector())
+registry.register(CacheCollector())
+registry.register(TraceCollector())
+
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition of the application registry."""
+    return generate_latest(registry)
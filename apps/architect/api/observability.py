@@ -1,17 +1,43 @@
 import os
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional
 
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from openinference.instrumentation.pydantic_ai import OpenInferenceSpanProcessor
+from apps.architect.domain.config import config as app_config
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
 
 # Dedicated logger for the observability layer
 logger = logging.getLogger(__name__)
 
+@dataclass
+class SpanStats:
+    """
+    Spans by outcome: sent to the collector, written to the fallback file,
+    left out by tail sampling, dropped on a full buffer or queue, or lost.
+    """
+    exported: int = 0
+    written: int = 0
+    sampled_out: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "exported": self.exported,
+            "written": self.written,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+span_stats = SpanStats()
+
+
 class PhoenixConfig:
     """Configuration for Phoenix/OTLP provider."""
     
@@ -24,14 +50,18 @@ class PhoenixProvider:
     """
     Handles OpenTelemetry initialization for Pydantic AI.
     Integrates with Arize Phoenix using OpenInference standards.
+    The SDK, the gRPC exporter and OpenInference are imported on initialize(),
+    not when the app module loads.
     """
 
     def __init__(self, config: Optional[PhoenixConfig] = None) -> None:
         self.config = config or PhoenixConfig()
-        self._provider: Optional[TracerProvider] = None
+        self._provider: Optional["TracerProvider"] = None
 
-    def _build_resource(self) -> Resource:
+    def _build_resource(self) -> "Resource":
         """Resource metadata for traces."""
+        from opentelemetry.sdk.resources import Resource
+
         return Resource.create({
             "service.name": self.config.project_name,
             "project.name": self.config.project_name,
@@ -40,26 +70,89 @@ class PhoenixProvider:
     def initialize(self) -> None:
         """Sets up the TracerProvider and OpenInference processors."""
         try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            from openinference.instrumentation.pydantic_ai import OpenInferenceSpanProcessor
+            from apps.architect.api.span_export import (
+                BatchingSpanProcessor,
+                OTLPJsonFileExporter,
+                TailSamplingSpanProcessor,
+            )
+
             if isinstance(trace.get_tracer_provider(), TracerProvider):
                 return
 
             self._provider = TracerProvider(resource=self._build_resource())
             
-            # OTLP Exporter for Phoenix (Insecure mode for local/dev cluster)
-            exporter = OTLPSpanExporter(endpoint=self.config.endpoint, insecure=True)
+            # OTLP Exporter for Phoenix (Insecure mode for local/dev cluster);
+            # an empty endpoint keeps the spans local
+            exporter = None
+            if self.config.endpoint:
+                exporter = OTLPSpanExporter(
+                    endpoint=self.config.endpoint,
+                    insecure=True,
+                    timeout=app_config.TRACE_EXPORT_TIMEOUT_S,
+                )
+            fallback = OTLPJsonFileExporter() if app_config.TRACE_FILE_FALLBACK else None
 
             # Essential for Pydantic AI: translates tool calls and agent runs into spans
             self._provider.add_span_processor(OpenInferenceSpanProcessor())
             
-            # Standard processor to export spans to the collector
-            self._provider.add_span_processor(SimpleSpanProcessor(exporter))
+            # Batched export from a background thread: a slow or unreachable
+            # collector never blocks the runs, spans are dropped instead.
+            # Only the traces kept by the tail sampler reach it.
+            self._provider.add_span_processor(
+                TailSamplingSpanProcessor(BatchingSpanProcessor(exporter, fallback))
+            )
 
             trace.set_tracer_provider(self._provider)
-            logger.info(f"✅ Phoenix observability initialized at {self.config.endpoint}")
+            logger.info(
+                f"✅ Phoenix observability initialized at {self.config.endpoint or 'no collector'}"
+                f"{f', fallback to {fallback.path}' if fallback else ''}"
+            )
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize Phoenix provider: {e}")
 
 def setup_observability() -> None:
     """Bootstrap observability service."""
-    PhoenixProvider().initialize()
\ No newline at end of file
+    PhoenixProvider().initialize()
+
+
+FAILED_RUN_STATUSES = ("failed", "timeout")
+
+
+@contextmanager
+def run_span(run_id: str) -> Iterator[Callable[[str, Optional[str]], None]]:
+    """
+    Root span of a pipeline run: the tail sampler keeps or drops the run's
+    trace as a whole. Yields a callback recording the final run status
+    and the path of the run's profile, if any.
+    """
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+
+    tracer = trace.get_tracer("apps.architect")
+    with tracer.start_as_current_span(
+        "pipeline.run", attributes={"run.id": run_id}, set_status_on_exception=False
+    ) as span:
+
+        def finish(status: str, profile: Optional[str] = None) -> None:
+            span.set_attribute("run.status", status)
+            if profile:
+                span.set_attribute("run.profile", profile)
+            if status in FAILED_RUN_STATUSES:
+                span.set_status(Status(StatusCode.ERROR, status))
+
+        yield finish
+
+
+def shutdown_observability() -> None:
+    """Flushes the queued spans on shutdown."""
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
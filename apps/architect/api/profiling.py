@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, List, Optional
+
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+# Profiler of the run the current task (and its sub-tasks) belongs to
+_profiled_run: contextvars.ContextVar[Optional["RunProfiler"]] = contextvars.ContextVar(
+    "profiled_run", default=None
+)
+
+_runs = itertools.count(1)
+
+
+def should_profile(requested: bool = False) -> bool:
+    """Profiles the requested runs, plus one run in PROFILE_EVERY_N when set."""
+    every = config.PROFILE_EVERY_N
+    return requested or (every > 0 and next(_runs) % every == 0)
+
+
+def _label(code: CodeType, module: Any) -> str:
+    return f"{module or '?'}:{code.co_qualname}"
+
+
+def _thread_stack(frame: Optional[FrameType]) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame.f_code, frame.f_globals.get("__name__")))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_stack(coro: Any) -> List[str]:
+    """Where a suspended task waits: its chain of awaiting coroutines."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_label(frame.f_code, frame.f_globals.get("__name__")))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+class RunProfiler:
+    """
+    Sampling profiler of one pipeline run, started and stopped in the run's
+    task. A thread samples the event loop every PROFILE_INTERVAL_S:
+    - the loop runs a task of this run (sub-tasks included): the Python stack
+      (validation, JSON parsing, ...) is recorded as is;
+    - otherwise the run is waiting (I/O, or the loop is busy elsewhere): the
+      await chain of the run's task is recorded under a "[waiting]" frame.
+    Stacks are written in the collapsed format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, run_id: str, interval_s: Optional[float] = None, directory: Optional[str] = None) -> None:
+        self.run_id = run_id
+        self.interval_s = interval_s or config.PROFILE_INTERVAL_S
+        self.directory = directory or config.PROFILE_DIR
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.run_id}.folded")
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread = threading.get_ident()
+        self._token = _profiled_run.set(self)
+        self._thread = threading.Thread(target=self._sample, name=f"profile-{self.run_id}", daemon=True)
+        self._thread.start()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                running = asyncio.current_task(self._loop)
+                if running is not None and running.get_context().get(_profiled_run) is self:
+                    stack = _thread_stack(sys._current_frames().get(self._loop_thread))
+                else:
+                    stack = ["[waiting]"] + _await_stack(self._task.get_coro())
+            except (RuntimeError, ValueError):
+                continue  # the loop thread changed state mid-sample
+            self.samples[";".join(stack)] += 1
+
+    def stop(self) -> None:
+        """Stops sampling; called from the run's task."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._token is not None:
+            _profiled_run.reset(self._token)
+
+    def write(self) -> Optional[str]:
+        """Writes the collapsed stacks (blocking I/O); returns the path, None without samples."""
+        if not self.samples:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"🔬 Run {self.run_id}: {sum(self.samples.values())} samples in {self.path}")
+        return self.path
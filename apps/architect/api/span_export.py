@@ -0,0 +1,263 @@
+import logging
+import os
+import queue
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from google.protobuf.json_format import MessageToJson
+from opentelemetry.context import Context
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import StatusCode
+
+from apps.architect.api.observability import SpanStats, span_stats
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class OTLPJsonFileExporter(SpanExporter):
+    """
+    Appends each batch as one OTLP JSON line (ExportTraceServiceRequest),
+    the format of the collector's file exporter and OTLP/HTTP JSON. The file
+    is rotated to `<path>.1` past `max_bytes`.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        self.path = path or config.TRACE_FILE
+        self.max_bytes = max_bytes if max_bytes is not None else config.TRACE_FILE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        line = MessageToJson(encode_spans(spans), indent=None) + "\n"
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class BatchingSpanProcessor(SpanProcessor):
+    """
+    Exports ended spans from a background thread, in batches. The request
+    path only enqueues the span: when the queue is full (collector slow or
+    down) new spans are dropped and counted instead of waiting. Batches the
+    exporter fails on go to the fallback exporter when there is one.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter],
+        fallback: Optional[SpanExporter] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_s: Optional[float] = None,
+        stats: SpanStats = span_stats,
+    ) -> None:
+        self.exporter = exporter
+        self.fallback = fallback
+        self.batch_size = max(1, batch_size or config.TRACE_BATCH_SIZE)
+        self.flush_s = flush_s if flush_s is not None else config.TRACE_FLUSH_S
+        self.stats = stats
+        self._queue: "queue.Queue[ReadableSpan]" = queue.Queue(max(1, queue_size or config.TRACE_QUEUE_SIZE))
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="span-export", daemon=True)
+        self._thread.start()
+
+    # --- Request path ---
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if self._stopped or not span.context.trace_flags.sampled:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    # --- Export thread ---
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self._drain()
+
+    def _batch(self) -> List[ReadableSpan]:
+        batch: List[ReadableSpan] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> None:
+        with self._export_lock:
+            while batch := self._batch():
+                self._export(batch)
+
+    def _export(self, batch: List[ReadableSpan]) -> None:
+        if self.exporter is not None and self._try(self.exporter, batch):
+            self.stats.exported += len(batch)
+        elif self.fallback is not None and self._try(self.fallback, batch):
+            self.stats.written += len(batch)
+        else:
+            self.stats.failed += len(batch)
+
+    @staticmethod
+    def _try(exporter: SpanExporter, batch: List[ReadableSpan]) -> bool:
+        try:
+            return exporter.export(batch) == SpanExportResult.SUCCESS
+        except Exception as e:
+            logger.warning(f"⚠️ Span export failed ({type(exporter).__name__}): {e}")
+            return False
+
+    # --- Lifecycle ---
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        self._drain()
+        return True
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=self.flush_s + 1)
+        self._drain()
+        for exporter in (self.exporter, self.fallback):
+            if exporter is not None:
+                exporter.shutdown()
+
+
+@dataclass
+class _PendingTrace:
+    spans: List[ReadableSpan] = field(default_factory=list)
+    failed: bool = False
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Buffers the spans of each trace until its root span ends, then passes
+    the whole trace downstream only if it took TRACE_SLOW_S or more, has a
+    failed span, was profiled, or falls in the TRACE_SAMPLE_RATE random share. Kept spans
+    get their long string attributes (prompts, completions) truncated.
+    Spans ending after the decision follow it; the buffers are bounded and
+    their overflow is dropped.
+    """
+
+    def __init__(
+        self,
+        downstream: SpanProcessor,
+        sample_rate: Optional[float] = None,
+        slow_s: Optional[float] = None,
+        max_attribute_chars: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_trace_spans: Optional[int] = None,
+        stats: SpanStats = span_stats,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.downstream = downstream
+        self.sample_rate = sample_rate if sample_rate is not None else config.TRACE_SAMPLE_RATE
+        self.slow_s = slow_s if slow_s is not None else config.TRACE_SLOW_S
+        self.max_attribute_chars = max_attribute_chars or config.TRACE_MAX_ATTRIBUTE_CHARS
+        self.max_pending = max(1, max_pending or config.TRACE_MAX_PENDING)
+        self.max_trace_spans = max(1, max_trace_spans or config.TRACE_MAX_TRACE_SPANS)
+        self.stats = stats
+        self.rng = rng or random.Random()
+        self._pending: "OrderedDict[int, _PendingTrace]" = OrderedDict()
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        with self._lock:
+            keep = self._decided.get(trace_id)
+            if keep is not None:
+                spans = [span]
+            else:
+                pending = self._buffer(trace_id)
+                pending.failed |= span.status.status_code == StatusCode.ERROR
+                root = span.parent is None or span.parent.is_remote
+                if root or len(pending.spans) < self.max_trace_spans:
+                    pending.spans.append(span)
+                else:
+                    self.stats.dropped += 1
+                if not root:
+                    return
+                del self._pending[trace_id]
+                keep = self._decide(span, pending.failed)
+                spans = pending.spans
+
+        if not keep:
+            self.stats.sampled_out += len(spans)
+            return
+        for kept in spans:
+            self._truncate(kept)
+            self.downstream.on_end(kept)
+
+    def _buffer(self, trace_id: int) -> _PendingTrace:
+        pending = self._pending.get(trace_id)
+        if pending is None:
+            if len(self._pending) >= self.max_pending:
+                _, evicted = self._pending.popitem(last=False)
+                self.stats.dropped += len(evicted.spans)
+            pending = self._pending[trace_id] = _PendingTrace()
+        return pending
+
+    def _decide(self, root: ReadableSpan, failed: bool) -> bool:
+        duration_s = (root.end_time - root.start_time) / 1e9
+        keep = (
+            failed
+            or duration_s >= self.slow_s
+            or "run.profile" in (root.attributes or {})
+            or self.rng.random() < self.sample_rate
+        )
+        self._decided[root.context.trace_id] = keep
+        if len(self._decided) > self.max_pending * 4:
+            self._decided.popitem(last=False)
+        return keep
+
+    def _truncate(self, span: ReadableSpan) -> None:
+        limit = self.max_attribute_chars
+        attributes = span.attributes or {}
+        if not any(isinstance(v, str) and len(v) > limit for v in attributes.values()):
+            return
+        # Ended spans are read-only: rewritten as OpenInferenceSpanProcessor does
+        span._attributes = {
+            key: f"{value[:limit]}... [{len(value) - limit} chars truncated]"
+            if isinstance(value, str) and len(value) > limit else value
+            for key, value in attributes.items()
+        }
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.downstream.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            # Runs still open at shutdown have no verdict
+            self.stats.dropped += sum(len(p.spans) for p in self._pending.values())
+            self._pending.clear()
+        self.downstream.shutdown()
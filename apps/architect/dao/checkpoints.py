@@ -0,0 +1,71 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from pydantic_graph import Graph
+from pydantic_graph.persistence import NodeSnapshot
+from pydantic_graph.persistence.file import FileStatePersistence
+
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class ResumablePersistence(FileStatePersistence):
+    """
+    File persistence (one JSON file per run) that can also restart the last
+    node of a run that failed or was interrupted. pydantic_graph only
+    resumes snapshots still in the 'created' status.
+    """
+
+    @asynccontextmanager
+    async def _lock(self, *, timeout: float = 30.0) -> AsyncIterator[None]:
+        # The 1s default fails runs whenever the event loop or the thread pool
+        # is busy for a moment; a run id only has one writer anyway
+        async with super()._lock(timeout=timeout):
+            yield
+
+    async def load_next(self) -> Optional[NodeSnapshot[Any, Any]]:
+        async with self._lock():
+            snapshots = await self.load_all()
+            last = snapshots[-1] if snapshots else None
+            if isinstance(last, NodeSnapshot) and last.status != "success":
+                # The snapshot holds the state as it was before this node ran
+                last.status = "pending"
+                last.start_ts = last.duration = None
+                await self._save(snapshots)
+                return last
+            return None
+
+
+class CheckpointStore:
+    """Node-level checkpoints of graph runs, stored under CHECKPOINT_DIR by run id."""
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = Path(directory or config.CHECKPOINT_DIR)
+
+    def path(self, run_id: str) -> Path:
+        return self.directory / f"{run_id}.json"
+
+    def exists(self, run_id: str) -> bool:
+        return self.path(run_id).exists()
+
+    def open(self, run_id: str, graph: Graph) -> ResumablePersistence:
+        os.makedirs(self.directory, exist_ok=True)
+        persistence = ResumablePersistence(self.path(run_id))
+        persistence.set_graph_types(graph)
+        return persistence
+
+    async def requirements(self, run_id: str, graph: Graph) -> Optional[str]:
+        """Requirements the checkpointed run was started with, None without checkpoint."""
+        snapshots = await self.open(run_id, graph).load_all()
+        return snapshots[0].state.requirements if snapshots else None
+
+    def discard(self, run_id: str) -> None:
+        """Drops the checkpoint of a completed run."""
+        self.path(run_id).unlink(missing_ok=True)
+
+
+checkpoints = CheckpointStore()
@@ -0,0 +1,376 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from apps.architect.dao.sqlite_db import SqliteStore
+from apps.architect.domain.config import config
+from apps.architect.dto.contracts import ArchitectureRequest
+from apps.architect.dto.states import AgentStateDTO, RunStatusDTO
+
+FINAL_STATUSES = ("success", "partial", "failed", "cancelled")
+
+
+@dataclass
+class Job:
+    """A pipeline run submitted to the job API."""
+    run_id: str
+    request: Optional[ArchitectureRequest]
+    resume: bool = False
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[AgentStateDTO] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def to_dto(self) -> RunStatusDTO:
+        return RunStatusDTO(
+            run_id=self.run_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            result=self.result,
+            error=self.error,
+        )
+
+
+def finished_event(job: Job) -> Dict[str, Any]:
+    """Last event of a run, stored with its final status."""
+    return {"event": "run-finished", "ts": job.finished_at, "status": job.status, "error": job.error}
+
+
+class MemoryJobStore:
+    """Jobs, queue and events of a single worker process."""
+
+    def __init__(self, retention: Optional[int] = None) -> None:
+        self.retention = retention if retention is not None else config.JOB_RETENTION
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._cancel: Set[str] = set()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    def _notify(self, run_id: str) -> None:
+        changed = self._changed.pop(run_id, None)
+        if changed is not None:
+            changed.set()
+
+    def add(self, job: Job) -> None:
+        self.jobs[job.run_id] = job
+        self.jobs.move_to_end(job.run_id)
+        self._events[job.run_id] = []
+        finished = [run_id for run_id, j in self.jobs.items() if j.done]
+        for run_id in finished[: max(0, len(self.jobs) - self.retention)]:
+            del self.jobs[run_id]
+            self._events.pop(run_id, None)
+        self._queue.put_nowait(job.run_id)
+
+    async def claim(self) -> Job:
+        """Waits for the next queued job and marks it running."""
+        while True:
+            job = self.jobs.get(await self._queue.get())
+            if job is not None and job.status == "queued":
+                job.status, job.started_at = "running", time.time()
+                return job
+
+    def finish(self, job: Job) -> bool:
+        """Records the final status of a claimed job and its run-finished event."""
+        self.jobs[job.run_id] = job
+        self._cancel.discard(job.run_id)
+        self.publish(job.run_id, finished_event(job))
+        return True
+
+    def get(self, run_id: str) -> Optional[Job]:
+        return self.jobs.get(run_id)
+
+    def queued(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def publish(self, run_id: str, event: Dict[str, Any]) -> None:
+        events = self._events.setdefault(run_id, [])
+        events.append({**event, "id": len(events)})
+        self._notify(run_id)
+
+    def events_after(self, run_id: str, after: int) -> List[Dict[str, Any]]:
+        return self._events.get(run_id, [])[after + 1 :]
+
+    async def wait(self, run_id: str, after: int, timeout: float) -> None:
+        """Returns once the run has events above `after` (or changed), or after timeout."""
+        if len(self._events.get(run_id, [])) > after + 1:
+            return
+        changed = self._changed.setdefault(run_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    def request_cancel(self, run_id: str) -> Optional[str]:
+        """'cancelled' for a queued job, 'requested' for a running one, None otherwise."""
+        job = self.jobs.get(run_id)
+        if job is None or job.done:
+            return None
+        if job.status == "queued":
+            job.status, job.finished_at = "cancelled", time.time()
+            self.publish(run_id, finished_event(job))
+            return "cancelled"
+        self._cancel.add(run_id)
+        return "requested"
+
+    def cancel_requested(self, run_ids: Iterable[str]) -> Set[str]:
+        return self._cancel.intersection(run_ids)
+
+
+class SqliteJobStore(SqliteStore):
+    """
+    Jobs, queue and events in the shared state database: any worker can
+    queue a job, the first idle worker claims it, and its status and events
+    can be followed from every worker. Waiting is done by polling.
+    A claimed job is leased to its worker, which renews it (heartbeat);
+    the running jobs of a worker that died are failed once their lease expires.
+    Methods block on the database (busy timeout under write contention):
+    callers on the event loop run them in a thread.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        run_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        request TEXT,
+        resume INTEGER NOT NULL DEFAULT 0,
+        result BLOB,
+        error TEXT,
+        cancel INTEGER NOT NULL DEFAULT 0,
+        worker_id TEXT,
+        heartbeat_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+    CREATE TABLE IF NOT EXISTS job_events (
+        run_id TEXT NOT NULL,
+        id INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        PRIMARY KEY (run_id, id)
+    );
+    """
+
+    COLUMNS = "run_id, status, created_at, started_at, finished_at, request, resume, result, error"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        retention: Optional[int] = None,
+        poll_s: Optional[float] = None,
+        poll_max_s: Optional[float] = None,
+        lease_s: Optional[float] = None,
+    ) -> None:
+        super().__init__(path or config.STATE_DB)
+        self.worker_id = uuid.uuid4().hex
+        self.lease_s = lease_s if lease_s is not None else config.JOB_LEASE_S
+        self.retention = retention if retention is not None else config.JOB_RETENTION
+        self.poll_s = poll_s if poll_s is not None else config.JOB_POLL_S
+        self.poll_max_s = max(self.poll_s, poll_max_s if poll_max_s is not None else config.JOB_POLL_MAX_S)
+
+    def _db(self) -> sqlite3.Connection:
+        opened = self._conn is None
+        conn = super()._db()
+        if opened:
+            # Lease columns added to the jobs table of existing state databases
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in (("worker_id", "TEXT"), ("heartbeat_at", "REAL")):
+                if name not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+                    except sqlite3.OperationalError:
+                        pass  # added by another worker meanwhile
+        return conn
+
+    @staticmethod
+    def _job(row: tuple) -> Job:
+        run_id, status, created_at, started_at, finished_at, request, resume, result, error = row
+        return Job(
+            run_id=run_id,
+            request=ArchitectureRequest.model_validate_json(request) if request else None,
+            resume=bool(resume),
+            status=status,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+            result=AgentStateDTO.model_validate_json(zlib.decompress(result)) if result else None,
+            error=error,
+        )
+
+    def add(self, job: Job) -> None:
+        final = ", ".join("?" * len(FINAL_STATUSES))
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (run_id, status, created_at, request, resume)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        job.run_id,
+                        job.status,
+                        job.created_at,
+                        job.request.model_dump_json() if job.request else None,
+                        int(job.resume),
+                    ),
+                )
+                conn.execute("DELETE FROM job_events WHERE run_id = ?", (job.run_id,))
+                expired = (
+                    f"SELECT run_id FROM jobs WHERE status IN ({final})"
+                    " ORDER BY finished_at DESC LIMIT -1 OFFSET ?"
+                )
+                params = (*FINAL_STATUSES, self.retention)
+                conn.execute(f"DELETE FROM job_events WHERE run_id IN ({expired})", params)
+                conn.execute(f"DELETE FROM jobs WHERE run_id IN ({expired})", params)
+
+    def _claim_one(self) -> Optional[Job]:
+        with self._lock:
+            conn = self._db()
+            # A read first: idle polling never takes the write lock
+            if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+                return None
+            with conn:
+                # Atomic: two workers polling at once never claim the same job
+                now = time.time()
+                row = conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, worker_id = ?, heartbeat_at = ?"
+                    " WHERE run_id = (SELECT run_id FROM jobs WHERE status = 'queued'"
+                    f" ORDER BY created_at LIMIT 1) RETURNING {self.COLUMNS}",
+                    (now, self.worker_id, now),
+                ).fetchone()
+        return self._job(row) if row else None
+
+    async def claim(self) -> Job:
+        """Polls for the next queued job, backing off from poll_s to poll_max_s while idle."""
+        delay = self.poll_s
+        while True:
+            job = await asyncio.to_thread(self._claim_one)
+            if job is not None:
+                return job
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.poll_max_s)
+
+    def finish(self, job: Job) -> bool:
+        """
+        Records the final status of a running job and its run-finished event
+        in one transaction: a follower that sees the job done has its last event.
+        """
+        result = zlib.compress(job.result.model_dump_json().encode("utf-8")) if job.result else None
+        with self._lock:
+            conn = self._db()
+            with conn:
+                # Not recorded if the lease was lost: the job was failed by another worker
+                if not conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, finished_at = ?, result = ?, error = ?"
+                    " WHERE run_id = ? AND status = 'running' AND worker_id = ?",
+                    (job.status, job.started_at, job.finished_at, result, job.error, job.run_id, self.worker_id),
+                ).rowcount:
+                    return False
+                self._insert_event(conn, job.run_id, finished_event(job))
+        return True
+
+    def get(self, run_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def queued(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    @staticmethod
+    def _insert_event(conn: sqlite3.Connection, run_id: str, event: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT INTO job_events (run_id, id, payload) VALUES (?, "
+            "(SELECT COALESCE(MAX(id), -1) + 1 FROM job_events WHERE run_id = ?), ?)",
+            (run_id, run_id, json.dumps(event)),
+        )
+
+    def publish(self, run_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                self._insert_event(conn, run_id, event)
+
+    def events_after(self, run_id: str, after: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, payload FROM job_events WHERE run_id = ? AND id > ? ORDER BY id",
+                (run_id, after),
+            ).fetchall()
+        return [{**json.loads(payload), "id": event_id} for event_id, payload in rows]
+
+    async def wait(self, run_id: str, after: int, timeout: float) -> None:
+        await asyncio.sleep(min(timeout, self.poll_s))
+
+    def request_cancel(self, run_id: str) -> Optional[str]:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                row = conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', finished_at = ?"
+                    f" WHERE run_id = ? AND status = 'queued' RETURNING {self.COLUMNS}",
+                    (time.time(), run_id),
+                ).fetchone()
+                if row:
+                    # Still queued: no worker will finish it, its last event goes with the status
+                    self._insert_event(conn, run_id, finished_event(self._job(row)))
+                    return "cancelled"
+                if conn.execute(
+                    "UPDATE jobs SET cancel = 1 WHERE run_id = ? AND status = 'running'", (run_id,)
+                ).rowcount:
+                    return "requested"
+        return None
+
+    def cancel_requested(self, run_ids: Iterable[str]) -> Set[str]:
+        run_ids = list(run_ids)
+        if not run_ids:
+            return set()
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT run_id FROM jobs WHERE cancel = 1 AND run_id IN ({', '.join('?' * len(run_ids))})",
+                run_ids,
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def heartbeat(self) -> None:
+        """Renews the lease of the jobs this worker is running."""
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE worker_id = ? AND status = 'running'",
+                    (time.time(), self.worker_id),
+                )
+
+    def expire_leases(self) -> List[str]:
+        """Fails the running jobs whose worker stopped renewing their lease."""
+        with self._lock:
+            conn = self._db()
+            with conn:
+                rows = conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'worker lost'"
+                    " WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?"
+                    f" RETURNING {self.COLUMNS}",
+                    (time.time(), time.time() - self.lease_s),
+                ).fetchall()
+                jobs = [self._job(row) for row in rows]
+                for job in jobs:
+                    self._insert_event(conn, job.run_id, finished_event(job))
+        return [job.run_id for job in jobs]
@@ -1,20 +1,37 @@
 import httpx
-from pydantic_ai.models.openai import OpenAIChatModel
-from pydantic_ai.providers.ollama import OllamaProvider
+from typing import TYPE_CHECKING, Optional
 from apps.architect.domain.config import config
 
-def get_llm_model() -> OpenAIChatModel:
+if TYPE_CHECKING:
+    from apps.architect.dao.output_repair import RepairingModel
+
+def get_llm_model(model_name: Optional[str] = None) -> "RepairingModel":
     """
     Factory creating the correct OpenAIChatModel with OllamaProvider.
+    Defaults to the large model when no model name is given.
+    Outputs go through local JSON repair before schema validation.
+    The OpenAI client (the heaviest import of the app) loads on the first call.
     """
+    from pydantic_ai.models.openai import OpenAIChatModel
+    from pydantic_ai.profiles.openai import OpenAIModelProfile
+    from pydantic_ai.providers.ollama import OllamaProvider
+    from apps.architect.dao.output_repair import RepairingModel
 
     timeout = httpx.Timeout(300.0)
     http_client = httpx.AsyncClient(timeout=timeout)
+    model_name = model_name or config.MODEL_NAME
 
-    return OpenAIChatModel(
-        model_name=config.MODEL_NAME,
-        provider=OllamaProvider(
-            base_url=f"{config.OLLAMA_URL}/v1",
-            http_client=http_client
-            ),
+    provider = OllamaProvider(
+        base_url=f"{config.OLLAMA_URL}/v1",
+        http_client=http_client
+        )
+    # Ollama turns the OpenAI response_format JSON schema into a decoding grammar
+    profile = provider.model_profile(model_name).update(
+        OpenAIModelProfile(supports_json_schema_output=True, supports_json_object_output=True)
     )
+
+    return RepairingModel(OpenAIChatModel(
+        model_name=model_name,
+        provider=provider,
+        profile=profile,
+    ))
@@ -0,0 +1,178 @@
+import hashlib
+import importlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from apps.architect.dao.sqlite_db import SqliteStore
+from apps.architect.domain.config import config
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class NodeCache:
+    """
+    Bounded LRU of graph node outputs, keyed by a hash of the node's inputs.
+    A rerun on slightly edited requirements recomputes only the nodes whose
+    inputs changed. Values are shared, not copied: node outputs are never
+    mutated once produced.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = max_entries if max_entries is not None else config.NODE_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(node: str, inputs: Any) -> str:
+        payload = json.dumps(inputs, sort_keys=True, default=_jsonable)
+        return f"{node}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+
+def _encode(updates: Dict[str, Any]) -> str:
+    """State updates as JSON, models tagged with their class to be validated again on read."""
+    items = {}
+    for name, value in updates.items():
+        if isinstance(value, BaseModel):
+            model = f"{type(value).__module__}:{type(value).__qualname__}"
+            items[name] = {"model": model, "value": value.model_dump(mode="json")}
+        else:
+            items[name] = {"value": value}
+    return json.dumps(items)
+
+
+def _decode(blob: Any) -> Dict[str, Any]:
+    updates = {}
+    for name, item in json.loads(blob).items():
+        if "model" in item:
+            module, qualname = item["model"].split(":")
+            model = getattr(importlib.import_module(module), qualname)
+            if not (isinstance(model, type) and issubclass(model, BaseModel)):
+                raise TypeError(f"{item['model']} is not a model")
+            updates[name] = model.model_validate(item["value"])
+        else:
+            updates[name] = item["value"]
+    return updates
+
+
+class SharedNodeCache(SqliteStore):
+    """
+    NodeCache stored in the shared state database, for multi-worker mode:
+    a rerun hits the cache whichever worker serves it. The database outlives
+    deploys: outputs are stored as JSON and validated against the current
+    models on read; an entry that no longer decodes or validates is a miss,
+    and is deleted. The least recently used entries are evicted.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS node_cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        used_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS node_cache_by_use ON node_cache (used_at);
+    """
+
+    key = staticmethod(NodeCache.key)
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None) -> None:
+        super().__init__(path or config.STATE_DB)
+        self.max_entries = max_entries if max_entries is not None else config.NODE_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._db().execute("SELECT 1 FROM node_cache WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM node_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._db()
+            row = conn.execute("SELECT value FROM node_cache WHERE key = ?", (key,)).fetchone()
+            try:
+                value = _decode(row[0]) if row is not None else None
+            except Exception:
+                # Written by an older version of the models (or corrupted)
+                with conn:
+                    conn.execute("DELETE FROM node_cache WHERE key = ?", (key,))
+                value = None
+            if value is None:
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE node_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        blob = _encode(value)
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO node_cache (key, value, used_at) VALUES (?, ?, ?)",
+                    (key, blob, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM node_cache WHERE key IN ("
+                    "SELECT key FROM node_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM node_cache")
+            self.hits = self.misses = 0
+
+
+node_cache = SharedNodeCache() if config.STATE_BACKEND == "sqlite" else NodeCache()
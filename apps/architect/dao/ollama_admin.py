@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from typing import Any, Coroutine, Dict, List, Optional, Set
+
+import httpx
+
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class ModelKeeper:
+    """
+    Manages Ollama model residency through its native API.
+    Models are preloaded at startup and pinned in memory while traffic is
+    present, then released after OLLAMA_IDLE_RELEASE_S without requests,
+    so the model load time is paid deliberately instead of by users.
+    With OLLAMA_WARMUP=false the keeper never loads nor pins anything:
+    Ollama's own keep-alive applies.
+    """
+
+    def __init__(self) -> None:
+        self.pinned = False
+        self.last_activity = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def models(self) -> List[str]:
+        return sorted({config.SMALL_MODEL_NAME, config.MODEL_NAME})
+
+    @property
+    def idle_s(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    async def _set_keep_alive(self, keep_alive: int) -> None:
+        """An empty generate request loads (or unloads) a model with the given keep-alive."""
+        async with httpx.AsyncClient(base_url=config.OLLAMA_URL, timeout=600.0) as client:
+            for model in self.models:
+                response = await client.post(
+                    "/api/generate", json={"model": model, "keep_alive": keep_alive}
+                )
+                response.raise_for_status()
+
+    async def pin(self, refresh: bool = False) -> None:
+        """
+        Loads the models and keeps them resident until released (keep_alive=-1).
+        Chat requests reset Ollama's keep-alive to its default, hence the refresh.
+        """
+        async with self._lock:
+            if self.pinned and not refresh:
+                return
+            start = time.perf_counter()
+            try:
+                await self._set_keep_alive(-1)
+                if not self.pinned:
+                    logger.info(f"🔥 Models {self.models} resident ({time.perf_counter() - start:.1f}s)")
+                self.pinned = True
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ Model warm-up failed: {e}")
+
+    async def release(self) -> None:
+        """Unloads the models (keep_alive=0)."""
+        async with self._lock:
+            if not self.pinned:
+                return
+            try:
+                await self._set_keep_alive(0)
+                self.pinned = False
+                logger.info(f"💤 Models {self.models} released after {self.idle_s:.0f}s idle")
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ Model release failed: {e}")
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        # The loop only keeps weak references to tasks: hold them until done
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def touch(self) -> None:
+        """Marks traffic; reloads the models in the background if they were released."""
+        self.last_activity = time.monotonic()
+        if config.OLLAMA_WARMUP and self._task and not self.pinned and not self._lock.locked():
+            self._spawn(self.pin())
+
+    async def status(self) -> Dict[str, Any]:
+        """Residency as reported by Ollama (/api/ps) plus the keeper's own state."""
+        resident: Dict[str, Any] = {}
+        try:
+            async with httpx.AsyncClient(base_url=config.OLLAMA_URL, timeout=5.0) as client:
+                response = await client.get("/api/ps")
+                response.raise_for_status()
+                resident = {m["name"]: m for m in response.json().get("models", [])}
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Could not read Ollama residency: {e}")
+
+        return {
+            "pinned": self.pinned,
+            "idle_s": round(self.idle_s, 1),
+            "idle_release_s": config.OLLAMA_IDLE_RELEASE_S,
+            "models": {
+                model: {
+                    "resident": model in resident,
+                    "expires_at": resident.get(model, {}).get("expires_at"),
+                    "size_vram": resident.get(model, {}).get("size_vram"),
+                }
+                for model in self.models
+            },
+        }
+
+    async def _watch(self) -> None:
+        """Keeps models pinned during traffic, releases them once the idle window has elapsed."""
+        interval = max(1.0, min(60.0, config.OLLAMA_IDLE_RELEASE_S / 4))
+        while True:
+            await asyncio.sleep(interval)
+            if not self.pinned:
+                continue
+            if self.idle_s > config.OLLAMA_IDLE_RELEASE_S:
+                await self.release()
+            else:
+                await self.pin(refresh=True)
+
+    async def start(self) -> None:
+        if config.OLLAMA_WARMUP:
+            self.last_activity = time.monotonic()
+            self._spawn(self.pin())
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        for task in [self._task, *self._background]:
+            if task:
+                task.cancel()
+        self._task = None
+
+
+model_keeper = ModelKeeper()
@@ -0,0 +1,211 @@
+import copy
+import json
+import logging
+import re
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import json_repair
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    ModelResponsePart,
+    RetryPromptPart,
+    TextPart,
+    ToolCallPart,
+)
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+logger = logging.getLogger(__name__)
+
+FENCE_RE = re.compile(r"^\s*```[\w-]*\s*\n?(.*?)\n?\s*```\s*$", re.DOTALL)
+BOOLEAN_WORDS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+# --- Repair Statistics ---
+
+@dataclass
+class RepairStats:
+    """Counts how many model outputs were fixed locally vs. sent back for a retry."""
+    responses: int = 0
+    repaired: int = 0
+    retries: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"responses": self.responses, "repaired": self.repaired, "retries": self.retries}
+
+    def reset(self) -> None:
+        self.responses = self.repaired = self.retries = 0
+
+
+repair_stats = RepairStats()
+
+
+# --- JSON Repair ---
+
+def strip_fences(text: str) -> str:
+    """Removes a surrounding Markdown code fence (```json ... ```)."""
+    match = FENCE_RE.match(text)
+    return match.group(1) if match else text
+
+
+def parse_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parses JSON, falling back on fence stripping then syntax repair
+    (trailing commas, quotes, unclosed brackets...).
+    Returns (value, repaired). Raises ValueError when nothing usable remains.
+    """
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    stripped = strip_fences(text).strip()
+    try:
+        return json.loads(stripped), True
+    except ValueError:
+        pass
+
+    value = json_repair.loads(stripped)
+    if value in ("", None):
+        raise ValueError("Output is not repairable JSON")
+    return value, True
+
+
+def coerce(value: Any, schema: Dict[str, Any], defs: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    Nudges near-miss values towards a JSON schema: fills defaults and empty
+    optional lists, wraps scalars expected as arrays, maps yes/no to booleans.
+    Anything it can't fix is left for pydantic validation.
+    Returns (value, changed).
+    """
+    ref = schema.get("$ref")
+    if ref:
+        schema = defs.get(ref.rsplit("/", 1)[-1], {})
+    kind = schema.get("type")
+
+    if kind == "object" and isinstance(value, dict):
+        changed = False
+        value = dict(value)
+        required = set(schema.get("required", []))
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                value[name], fixed = coerce(value[name], sub, defs)
+                changed |= fixed
+            elif "default" in sub:
+                value[name] = copy.deepcopy(sub["default"])
+                changed = True
+            elif name not in required and sub.get("type") == "array":
+                value[name] = []
+                changed = True
+        return value, changed
+
+    if kind == "array":
+        if value is None:
+            return [], True
+        changed = False
+        if not isinstance(value, list):
+            value, changed = [value], True
+        items = schema.get("items")
+        if items:
+            fixed_items = [coerce(item, items, defs) for item in value]
+            value = [item for item, _ in fixed_items]
+            changed |= any(fixed for _, fixed in fixed_items)
+        return value, changed
+
+    if kind == "boolean" and isinstance(value, str):
+        word = value.strip().lower()
+        if word in BOOLEAN_WORDS:
+            return BOOLEAN_WORDS[word], True
+
+    if kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value), True
+
+    return value, False
+
+
+def repair_json(text: str, schema: Optional[Dict[str, Any]]) -> Tuple[Any, bool]:
+    """Parses then coerces a raw model output. Returns (value, repaired)."""
+    value, repaired = parse_lenient(text)
+    if schema:
+        value, coerced = coerce(value, schema, schema.get("$defs", {}))
+        repaired |= coerced
+    return value, repaired
+
+
+# --- Model Wrapper ---
+
+class RepairingModel(WrapperModel):
+    """
+    Repairs structured outputs between the model and schema validation.
+    A PydanticAI retry (a full new generation) only happens when the
+    local repair could not produce a valid payload.
+    """
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        if _is_retry(messages):
+            repair_stats.retries += 1
+
+        response = await super().request(messages, model_settings, model_request_parameters)
+        repair_stats.responses += 1
+
+        parts = [self._repair_part(p, response, model_request_parameters) for p in response.parts]
+        if any(new is not old for new, old in zip(parts, response.parts)):
+            repair_stats.repaired += 1
+            logger.info(f"🩹 Repaired structured output from {self.model_name}")
+            return replace(response, parts=parts)
+        return response
+
+    def _repair_part(
+        self,
+        part: ModelResponsePart,
+        response: ModelResponse,
+        params: ModelRequestParameters,
+    ) -> ModelResponsePart:
+        try:
+            if isinstance(part, ToolCallPart) and isinstance(part.args, str):
+                tool = params.tool_defs.get(part.tool_name)
+                if tool is None or tool not in params.output_tools:
+                    return part
+                value, repaired = repair_json(part.args, tool.parameters_json_schema)
+                return replace(part, args=json.dumps(value)) if repaired else part
+
+            if isinstance(part, TextPart):
+                return self._repair_text(part, response, params)
+        except ValueError:
+            pass  # Unrepairable: let validation fail and PydanticAI retry
+        return part
+
+    def _repair_text(
+        self, part: TextPart, response: ModelResponse, params: ModelRequestParameters
+    ) -> ModelResponsePart:
+        if params.output_mode in ("native", "prompted") and params.output_object:
+            value, repaired = repair_json(part.content, params.output_object.json_schema)
+            return replace(part, content=json.dumps(value)) if repaired else part
+
+        # Tool mode: a model answering with JSON text instead of calling the
+        # single output tool is turned into that tool call.
+        has_tool_call = any(isinstance(p, ToolCallPart) for p in response.parts)
+        if params.output_mode == "tool" and not params.allow_text_output \
+                and len(params.output_tools) == 1 and not has_tool_call:
+            tool = params.output_tools[0]
+            value, _ = repair_json(part.content, tool.parameters_json_schema)
+            if isinstance(value, dict):
+                return ToolCallPart(tool_name=tool.name, args=json.dumps(value))
+        return part
+
+
+def _is_retry(messages: List[ModelMessage]) -> bool:
+    """True when the last request sends a validation error back to the model."""
+    last = messages[-1] if messages else None
+    return isinstance(last, ModelRequest) and any(
+        isinstance(p, RetryPromptPart) for p in last.parts
+    )
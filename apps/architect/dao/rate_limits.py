@@ -0,0 +1,47 @@
+import time
+from typing import Optional
+
+from apps.architect.dao.sqlite_db import SqliteStore
+from apps.architect.domain.config import config
+
+
+class SharedTokenBuckets(SqliteStore):
+    """
+    Per-client token buckets of the admission control in the shared state
+    database, for multi-worker mode: a client gets the same rate limit
+    whichever worker serves it. A bucket is refilled and taken from in a
+    single statement, so concurrent workers never spend the same token.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_buckets (
+        client TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated REAL NOT NULL,
+        admitted INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS rate_buckets_by_update ON rate_buckets (updated);
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        super().__init__(path or config.STATE_DB)
+
+    def take(self, client: str, rate: float, burst: int) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available."""
+        now = time.time()
+        refilled = "MIN(:burst, tokens + MAX(0, :now - updated) * :rate)"
+        with self._lock:
+            conn = self._db()
+            with conn:
+                tokens, admitted = conn.execute(
+                    "INSERT INTO rate_buckets (client, tokens, updated, admitted)"
+                    " VALUES (:client, :burst - 1, :now, 1) ON CONFLICT (client) DO UPDATE SET"
+                    f" tokens = {refilled} - ({refilled} >= 1), admitted = {refilled} >= 1, updated = :now"
+                    " RETURNING tokens, admitted",
+                    {"client": client, "burst": burst, "now": now, "rate": rate},
+                ).fetchone()
+                # A bucket left alone until full is the same as no bucket
+                conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - burst / rate,))
+        if admitted:
+            return 0.0
+        return (1 - tokens) / rate
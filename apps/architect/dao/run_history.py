@@ -0,0 +1,136 @@
+import hashlib
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from apps.architect.dao.sqlite_db import SqliteStore
+from apps.architect.domain.config import config
+from apps.architect.dto.states import AgentStateDTO, RunPayloadDTO, RunRecordDTO
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    requirements_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_requirements ON runs (requirements_hash, seq);
+CREATE INDEX IF NOT EXISTS runs_by_status ON runs (status, seq);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (created_at);
+"""
+
+SUMMARY_COLUMNS = "seq, run_id, created_at, status, requirements_hash, model, duration_s"
+
+
+def requirements_hash(requirements: str) -> str:
+    """Reruns of the same requirements (modulo surrounding whitespace) share a hash."""
+    return hashlib.sha256(requirements.strip().encode("utf-8")).hexdigest()
+
+
+def _summary(row: Tuple) -> Dict[str, Any]:
+    return dict(zip(("seq", "run_id", "created_at", "status", "requirements_hash", "model", "duration_s"), row))
+
+
+class RunHistory(SqliteStore):
+    """
+    SQLite store of past pipeline runs.
+    The bulky part (request, final state, node timings) is a zlib-compressed
+    JSON payload, only decompressed when a single run is fetched. Listings
+    read the indexed columns and paginate by keyset (seq < cursor), so a page
+    costs the same with 100 or 100k stored runs; a time range goes through
+    the created_at index.
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        super().__init__(path or config.HISTORY_DB)
+
+    def record(
+        self,
+        run_id: str,
+        status: str,
+        requirements: str,
+        model: str,
+        duration_s: float,
+        result: Optional[AgentStateDTO] = None,
+        node_timings: Optional[List[Dict[str, Any]]] = None,
+        models: Optional[Dict[str, str]] = None,
+        error: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> None:
+        """Stores (or replaces, for a resumed run) the outcome of a run."""
+        payload = RunPayloadDTO(
+            request={"requirements": requirements},
+            result=result,
+            node_timings=node_timings or [],
+            models=models or {},
+            error=error,
+            profile=profile,
+        )
+        blob = zlib.compress(payload.model_dump_json().encode("utf-8"))
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs (run_id, created_at, status, requirements_hash,"
+                    " model, duration_s, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, time.time(), status, requirements_hash(requirements), model, duration_s, blob),
+                )
+
+    def list_runs(
+        self,
+        limit: int = 50,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
+        requirements_hash: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Newest runs first, optionally those recorded in [since, until) (epoch
+        seconds); returns the page and the cursor of the next one (None at the end).
+        """
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if before is not None:
+            clauses.append("seq < ?")
+            params.append(before)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if requirements_hash:
+            clauses.append("requirements_hash = ?")
+            params.append(requirements_hash)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM runs {where} ORDER BY seq DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        page = [_summary(row) for row in rows[:limit]]
+        cursor = page[-1]["seq"] if len(rows) > limit else None
+        return page, cursor
+
+    def get(self, run_id: str) -> Optional[RunRecordDTO]:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {SUMMARY_COLUMNS}, payload FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload = RunPayloadDTO.model_validate_json(zlib.decompress(row[-1]))
+        return RunRecordDTO(**_summary(row[:-1]), **dict(payload))
+
+
+run_history = RunHistory()
@@ -0,0 +1,37 @@
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SqliteStore:
+    """
+    Base of the SQLite-backed stores: one lazily opened connection per
+    process, shared by its threads behind a lock. WAL lets the workers of a
+    multi-process deployment read while one of them writes.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use; calls may come from worker threads (asyncio.to_thread)
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
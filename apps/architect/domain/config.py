@@ -1,7 +1,14 @@
+import os
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, Field
 
 
+# Model tiers used by the per-task routing
+SMALL_TIER = "small"
+LARGE_TIER = "large"
+
+
 class Settings(BaseSettings):
     # Modern Pydantic V2 Configuration
     model_config = ConfigDict(env_file=".env", extra="ignore")
@@ -9,11 +16,157 @@ class Settings(BaseSettings):
     ENV: str = Field(default="local")
     OLLAMA_URL: str = Field(default="http://localhost:11434")
 
+    # Optional overrides of the model behind each tier
+    SMALL_MODEL: Optional[str] = Field(default=None)
+    LARGE_MODEL: Optional[str] = Field(default=None)
+
+    # Per-agent / per-task profiles: "<agent>.<task>" (or "<agent>") -> tier.
+    # Classification and short list tasks run on the small tier and are
+    # escalated to the large tier when their output fails validation.
+    MODEL_PROFILES: Dict[str, str] = Field(
+        default_factory=lambda: {
+            "pm.check_requirements": SMALL_TIER,
+            "pm.fill_gaps_with_hypotheses": SMALL_TIER,
+            "pm.generate_specs": LARGE_TIER,
+            "analyst": LARGE_TIER,
+        }
+    )
+
+    # Structured outputs: "native" constrains Ollama decoding to the output
+    # JSON schema, "tool" relies on tool calls and schema hints in the prompt
+    STRUCTURED_OUTPUT: str = Field(default="native")
+
+    # Ollama residency: preload models at startup, keep them pinned while
+    # traffic is present and release them after this many idle seconds
+    OLLAMA_WARMUP: bool = Field(default=True)
+    OLLAMA_IDLE_RELEASE_S: int = Field(default=1800)
+
+    # Deadline of a pipeline run (None: unbounded); on expiry, return the
+    # nodes completed so far instead of failing when PARTIAL_ON_DEADLINE
+    RUN_DEADLINE_S: Optional[float] = Field(default=1800)
+    PARTIAL_ON_DEADLINE: bool = Field(default=True)
+
+    # Node outputs kept for reruns on edited requirements (0 disables the cache)
+    NODE_CACHE_SIZE: int = Field(default=128)
+
+    # Pre-render the workflow diagram to SVG at startup (calls mermaid.ink
+    # once, then cached on disk); otherwise browsers render the Mermaid text
+    DIAGRAM_PRERENDER: bool = Field(default=False)
+
+    # Serving: worker processes (one port each from 8080, behind a sticky
+    # proxy) and where run state lives: "memory" (single worker) or "sqlite"
+    # (shared by the workers, forced when WORKERS > 1)
+    WORKERS: int = Field(default=1)
+    STATE_BACKEND: str = Field(default="memory")
+    JOB_POLL_S: float = Field(default=0.2)
+    # Idle workers back off their SQLite queue polling up to this interval
+    JOB_POLL_MAX_S: float = Field(default=2.0)
+    # A worker renews the lease of its SQLite jobs every JOB_LEASE_S / 3;
+    # running jobs of a worker silent for JOB_LEASE_S are marked failed
+    JOB_LEASE_S: float = Field(default=30.0)
+
+    # Admission control of new runs (UI and API): runs executing at once
+    # (in total: each of the WORKERS runs its share, at least one), per-client
+    # token bucket (runs per minute, burst; shared by the workers) and the
+    # estimated queue wait beyond which runs are rejected with a retry delay;
+    # a run is assumed to take RUN_ESTIMATE_S until durations are observed
+    MAX_CONCURRENT_RUNS: int = Field(default=2)
+    RATE_LIMIT_PER_MIN: float = Field(default=6)
+    RATE_LIMIT_BURST: int = Field(default=3)
+    MAX_QUEUE_WAIT_S: float = Field(default=120)
+    RUN_ESTIMATE_S: float = Field(default=120)
+    # Proxies in front of the app (Traefik: 1), each appending the address it
+    # received the request from to X-Forwarded-For; 0 uses the peer address
+    TRUSTED_PROXY_HOPS: int = Field(default=1)
+
+    # Span export: batches of up to TRACE_BATCH_SIZE sent every TRACE_FLUSH_S
+    # by a background thread; spans beyond TRACE_QUEUE_SIZE are dropped.
+    # Batches the collector rejects go to an OTLP JSON lines file when
+    # TRACE_FILE_FALLBACK (rotated past TRACE_FILE_MAX_MB)
+    TRACE_QUEUE_SIZE: int = Field(default=2048)
+    TRACE_BATCH_SIZE: int = Field(default=512)
+    TRACE_FLUSH_S: float = Field(default=5.0)
+    TRACE_EXPORT_TIMEOUT_S: float = Field(default=10.0)
+    TRACE_FILE_FALLBACK: bool = Field(default=True)
+    TRACE_FILE_MAX_MB: int = Field(default=50)
+
+    # Tail sampling: the spans of a run are buffered and its trace exported
+    # only if the run took TRACE_SLOW_S or more, failed, or falls in the
+    # TRACE_SAMPLE_RATE random share. Exported string attributes (prompts,
+    # completions) are cut to TRACE_MAX_ATTRIBUTE_CHARS; at most
+    # TRACE_MAX_PENDING traces of TRACE_MAX_TRACE_SPANS spans are buffered
+    TRACE_SAMPLE_RATE: float = Field(default=0.1)
+    TRACE_SLOW_S: float = Field(default=120.0)
+    TRACE_MAX_ATTRIBUTE_CHARS: int = Field(default=4096)
+    TRACE_MAX_PENDING: int = Field(default=256)
+    TRACE_MAX_TRACE_SPANS: int = Field(default=2000)
+
+    # Sampling profiles of runs (collapsed stacks under PROFILE_DIR): runs
+    # submitted with profile=true (or the X-Profile header), plus one run
+    # in PROFILE_EVERY_N (0: only on request)
+    PROFILE_EVERY_N: int = Field(default=0)
+    PROFILE_INTERVAL_S: float = Field(default=0.005)
+
+    # Event loop monitor: lag measured every LOOP_MONITOR_INTERVAL_S; a loop
+    # stuck for LOOP_BLOCK_THRESHOLD_S has its blocking stack logged
+    LOOP_MONITOR: bool = Field(default=True)
+    LOOP_MONITOR_INTERVAL_S: float = Field(default=0.1)
+    LOOP_BLOCK_THRESHOLD_S: float = Field(default=0.5)
+
+    # Local storage of the app (checkpoints, run history, ...)
+    DATA_DIR: str = Field(default=".architect")
+
+    # Pipeline runs executed at once by the batch mode
+    BATCH_CONCURRENCY: int = Field(default=2)
+
+    # Job API: runs executed at once in the background, finished jobs kept in memory
+    JOB_WORKERS: int = Field(default=2)
+    JOB_RETENTION: int = Field(default=1000)
+
+    # Long-input mode of the Analyst: token budget per section and
+    # number of sections analyzed concurrently
+    ANALYST_SECTION_TOKENS: int = Field(default=3000)
+    ANALYST_MAX_PARALLEL: int = Field(default=4)
+
     @property
     def MODEL_NAME(self) -> str:
+        if self.LARGE_MODEL:
+            return self.LARGE_MODEL
         if self.ENV.lower() == "test":
             return "qwen3:0.6b"
         return "nemotron-3-nano:30b"
 
+    @property
+    def CHECKPOINT_DIR(self) -> str:
+        return os.path.join(self.DATA_DIR, "checkpoints")
+
+    @property
+    def STATE_DB(self) -> str:
+        return os.path.join(self.DATA_DIR, "state.db")
+
+    @property
+    def PROFILE_DIR(self) -> str:
+        return os.path.join(self.DATA_DIR, "profiles")
+
+    @property
+    def TRACE_FILE(self) -> str:
+        return os.path.join(self.DATA_DIR, "traces", "spans.jsonl")
+
+    @property
+    def HISTORY_DB(self) -> str:
+        return os.path.join(self.DATA_DIR, "history.db")
+
+    @property
+    def SMALL_MODEL_NAME(self) -> str:
+        return self.SMALL_MODEL or "qwen3:0.6b"
+
+    def tier_for(self, task: str) -> str:
+        """Resolves the tier of a task, falling back on its agent profile."""
+        agent = task.split(".", 1)[0]
+        return self.MODEL_PROFILES.get(task, self.MODEL_PROFILES.get(agent, LARGE_TIER))
+
+    def model_for_tier(self, tier: str) -> str:
+        return self.SMALL_MODEL_NAME if tier == SMALL_TIER else self.MODEL_NAME
+
 
 config = Settings()
@@ -1,4 +1,5 @@
-from typing import List, Dict
+import re
+from typing import List, Dict, Sequence
 from pydantic import BaseModel, Field
 
 
@@ -10,6 +11,25 @@ class CadrageReport(BaseModel):
     risks: List[str]
     clarification_questions: List[str]
 
+    @classmethod
+    def merge(cls, reports: Sequence["CadrageReport"]) -> "CadrageReport":
+        """
+        Deterministic merge of partial reports (e.g. one per CDC section).
+        Items keep their first-seen order; duplicates differing only by
+        case, spacing or trailing punctuation are dropped.
+        """
+        merged: Dict[str, List[str]] = {}
+        for field in cls.model_fields:
+            seen = set()
+            items = merged.setdefault(field, [])
+            for report in reports:
+                for item in getattr(report, field):
+                    key = re.sub(r"\s+", " ", item).strip(" .;:").casefold()
+                    if key and key not in seen:
+                        seen.add(key)
+                        items.append(item.strip())
+        return cls(**merged)
+
 
 # Architect
 class ADR(BaseModel):
@@ -19,6 +39,12 @@ class ADR(BaseModel):
     consequences: list
 
 
+class ArchitectureSpecs(BaseModel):
+    """Output of the Architect: the C4 diagram (Mermaid) and its ADR."""
+    diagram: str
+    adr: ADR
+
+
 # Software Engineer
 class SOLIDCode(BaseModel):
     class_name: str
@@ -0,0 +1,52 @@
+import re
+from typing import List
+
+# Rough average for the tokenizers we use (qwen, nemotron): ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting prompts (split_sections' max_chars fits max_tokens)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def split_sections(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits a document into sections of at most max_tokens (estimated).
+    Paragraph boundaries are kept whenever possible, then lines,
+    and only oversized lines are cut.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    sections: List[str] = []
+    current = ""
+
+    for block in _blocks(text, max_chars):
+        candidate = f"{current}\n\n{block}" if current else block
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            sections.append(current)
+        current = block
+
+    if current:
+        sections.append(current)
+    return sections
+
+
+def _blocks(text: str, max_chars: int) -> List[str]:
+    """Paragraphs, themselves split by lines then by size when too long."""
+    blocks: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            blocks.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            blocks.extend(
+                line[i : i + max_chars] for i in range(0, len(line), max_chars)
+            )
+    return blocks
@@ -1,8 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Optional
 
 class ArchitectureRequest(BaseModel):
     requirements: str
+    profile: bool = Field(default=False, description="Record a sampling profile of the run")
+
+
+class BatchItem(BaseModel):
+    """One line of a batch input JSONL file."""
+    id: Optional[str] = Field(default=None, description="Stable id, defaults to the line number")
+    requirements: str
 
 
 class PMAnalysisReport(BaseModel):
@@ -13,4 +20,5 @@ class PMAnalysisReport(BaseModel):
     is_smart: bool = Field(default=False, description="True if requirements meet SMART criteria")
     gaps: List[str] = Field(default_factory=list, description="List of missing information")
     hypotheses: List[str] = Field(default_factory=list, description="Technical assumptions")
-    content: Union[str, Dict[str, Any]]
\ No newline at end of file
+    # Filled by the PM agent with the raw requirements, not by the model
+    content: Union[str, Dict[str, Any]] = Field(default="", description="Analyzed requirements")
\ No newline at end of file
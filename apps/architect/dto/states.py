@@ -1,12 +1,78 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from apps.architect.domain.models import ArchitectureSpecs, CadrageReport, SOLIDCode
+from apps.architect.dto.contracts import PMAnalysisReport
 
 
 class AgentStateDTO(BaseModel):
+    """
+    Result of a run. Carries the typed agent outputs without copying them
+    (model instances are not revalidated); serialize with model_dump_json.
+    """
+    run_id: Optional[str] = Field(default=None, description="Checkpoint id, used to resume the run")
+    partial: bool = Field(default=False, description="The deadline stopped the run before the last node")
     requirements: str
-    charter_data: Dict[str, Any] = Field(default_factory=dict)
-    analysis_report: Optional[Dict[str, Any]] = None
-    architecture_specs: Optional[Dict[str, Any]] = None
-    final_code: Optional[Dict[str, Any]] = None
+    charter_data: PMAnalysisReport = Field(default_factory=PMAnalysisReport)
+    analysis_report: Optional[CadrageReport] = None
+    architecture_specs: Optional[ArchitectureSpecs] = None
+    final_code: Optional[SOLIDCode] = None
     is_ready: bool = False
     retry_count: int = 0
+    reused_nodes: List[str] = Field(default_factory=list, description="Nodes served from the node cache")
+    recomputed_nodes: List[str] = Field(default_factory=list, description="Nodes executed by this run")
+
+
+class BatchResultDTO(BaseModel):
+    """One line of a batch output JSONL file."""
+    id: str
+    status: str = Field(description="ok or failed")
+    duration_s: float = 0.0
+    result: Optional[AgentStateDTO] = None
+    error: Optional[str] = None
+
+
+class NodeTimingDTO(BaseModel):
+    node: str
+    duration_s: float
+
+
+class RunSummaryDTO(BaseModel):
+    """A stored run, as listed by the history (no payload)."""
+    seq: int = Field(description="Insertion order, also the pagination cursor")
+    run_id: str
+    created_at: float = Field(description="Unix timestamp of the run end")
+    status: str = Field(description="success, timeout, cancelled or failed")
+    requirements_hash: str
+    model: str
+    duration_s: float
+
+
+class RunPayloadDTO(BaseModel):
+    """Compressed part of a stored run: request, final state and node timings."""
+    request: Dict[str, Any] = Field(default_factory=dict)
+    result: Optional[AgentStateDTO] = None
+    node_timings: List[NodeTimingDTO] = Field(default_factory=list)
+    models: Dict[str, str] = Field(default_factory=dict)
+    error: Optional[str] = None
+    profile: Optional[str] = Field(default=None, description="Sampling profile (collapsed stacks) of the run")
+
+
+class RunRecordDTO(RunPayloadDTO, RunSummaryDTO):
+    """A stored run, summary and payload."""
+
+
+class RunPageDTO(BaseModel):
+    items: List[RunSummaryDTO]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as `before` for the next page")
+
+
+class RunStatusDTO(BaseModel):
+    """A run submitted to the job API."""
+    run_id: str
+    status: str = Field(description="queued, running, success, partial, failed or cancelled")
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[AgentStateDTO] = None
+    error: Optional[str] = None
@@ -1,19 +1,36 @@
+import asyncio
+import importlib
 import os
 import multiprocessing
+import subprocess
 import sys
 import logging
 import uvicorn
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Any, Dict, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from nicegui import ui
 
 # Internal project imports
 from apps.architect.ui.layout import ArchitectLayout
+from apps.architect.ui.diagram import WorkflowDiagram
 from apps.architect.api.controller import ArchitectController
-from apps.architect.api.observability import setup_observability
-from apps.architect.agents.orchestrator import app_workflow
+from apps.architect.api.admission import RATE_LIMITED, AdmissionRejected, admission, client_key
+from apps.architect.api.batch import BatchRunner, parse_items
+from apps.architect.api.jobs import job_manager, sse
+from apps.architect.api.loop_monitor import loop_monitor
+from apps.architect.dao.checkpoints import checkpoints
+from apps.architect.api.observability import setup_observability, shutdown_observability
+from apps.architect.agents.orchestrator import app_workflow, PMNode
+from apps.architect.domain.config import config
+from apps.architect.dao.ollama_admin import model_keeper
+from apps.architect.dao.run_history import run_history, requirements_hash
+from apps.architect.dto.contracts import ArchitectureRequest
+from apps.architect.dto.states import RunPageDTO, RunRecordDTO, RunStatusDTO
+from apps.architect.api.metrics import UI_SESSIONS, render_metrics
 
 # Configure Logger for production-level feedback
 logging.basicConfig(
@@ -25,6 +42,9 @@ logger = logging.getLogger(__name__)
 # Check if we are in development mode via environment variable
 is_dev_mode = os.getenv("APP_ENV", "prod") == "dev"
 
+# The graph is static: its diagram is built once per process, not per page
+workflow_diagram = WorkflowDiagram(app_workflow, PMNode)
+
 class TheArchitectApp:
     """
     Main Application class following the Controller-View pattern.
@@ -39,16 +59,40 @@ class TheArchitectApp:
         self.view = ArchitectLayout(on_start=self.handle_analysis)
 
         # Display the graph structure on the home page
-        self.view.update_graph(app_workflow)
+        self.view.update_graph(workflow_diagram)
+
+        # A closed tab cancels its run: no LLM calls are spent for nobody
+        self._run_task: Optional[asyncio.Task] = None
+        ui.context.client.on_delete(self.cancel_run)
+        self.client_key = client_key(ui.context.client.request)
+
+    def cancel_run(self) -> None:
+        if self._run_task and not self._run_task.done():
+            logger.info("🔌 Client disconnected, cancelling its pipeline run")
+            self._run_task.cancel()
 
     async def handle_analysis(self, requirements: str) -> None:
         """
         Handles the full pipeline execution with UI feedback.
+        Under overload the run is refused at once instead of queuing behind the others.
         """
+        try:
+            await admission.check(self.client_key, backlog=await job_manager.queued())
+        except AdmissionRejected as e:
+            ui.notify(str(e), type="warning")
+            return
         self.view.toggle_loader(True)
+        self._run_task = asyncio.create_task(
+            self.controller.run_full_pipeline(ArchitectureRequest(requirements=requirements))
+        )
         try:
-            result = await self.controller.run_full_pipeline(requirements)
-            self.view.display_results(result)
+            result = await self._run_task
+            if result.partial:
+                ui.notify("Deadline reached: showing the steps completed so far", type="warning")
+            # Single serialization of the typed state, for the browser
+            self.view.display_results(result.model_dump(mode="json"))
+        except asyncio.CancelledError:
+            logger.info("Pipeline run cancelled")
         except Exception as e:
             logger.error(f"Pipeline execution failed: {e}")
             ui.notify(f"Error: {str(e)}", type="negative")
@@ -64,8 +108,25 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting API Engine & Observability...")
     # Global init for tracing all requests (FastAPI + NiceGUI)
     setup_observability()
+    # Lag metric and blocking-call reports of the event loop
+    await loop_monitor.start()
+    # Build the workflow diagram before the first page needs it
+    logger.info(f"🗺️ Workflow diagram ready ({len(workflow_diagram.mermaid)} chars)")
+    if config.DIAGRAM_PRERENDER:
+        await asyncio.to_thread(workflow_diagram.prerender)
+    # Preload the models and manage their keep-alive from now on
+    await model_keeper.start()
+    await job_manager.start()
+    # The LLM client stack is imported lazily; load it in the background
+    # so that readiness does not wait for it, nor the first run
+    asyncio.get_running_loop().run_in_executor(None, importlib.import_module, "pydantic_ai.models.openai")
     yield
     logger.info("🛑 Shutting down API Engine...")
+    await job_manager.stop()
+    await model_keeper.stop()
+    await loop_monitor.stop()
+    run_history.close()
+    await asyncio.to_thread(shutdown_observability)
 
 
 # Instantiate FastAPI with Lifespan Swagger/OpenAPI
@@ -79,6 +140,16 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, e: AdmissionRejected) -> Response:
+    """429 when the client exceeds its rate limit, 503 when the server is overloaded."""
+    return JSONResponse(
+        {"detail": str(e), "reason": e.reason, "retry_after_s": e.retry_after_s},
+        status_code=429 if e.reason == RATE_LIMITED else 503,
+        headers={"Retry-After": str(e.retry_after_s)},
+    )
+
+
 @app.get("/api/status")
 async def get_status() -> Dict[str, str]:
     """
@@ -86,6 +157,194 @@ async def get_status() -> Dict[str, str]:
     """
     return {"status": "ok"}
 
+
+@app.get("/api/models")
+async def get_models() -> Dict[str, Any]:
+    """
+    Model residency (loaded in Ollama, pinned, idle time).
+    """
+    return await model_keeper.status()
+
+
+@app.get("/api/metrics")
+def get_metrics() -> Response:
+    """
+    Prometheus metrics (text exposition format).
+    """
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/api/batch")
+async def run_batch(request: Request, concurrency: Optional[int] = None) -> StreamingResponse:
+    """
+    Runs a JSONL body of {"id", "requirements"} lines through the pipeline,
+    streaming one JSONL result per line as soon as each run completes.
+    A batch is admitted as a single run; its items then share the run slots.
+    """
+    await admission.check(client_key(request), backlog=await job_manager.queued())
+    try:
+        items = parse_items((await request.body()).decode("utf-8").splitlines())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def results():
+        async for result in BatchRunner(concurrency=concurrency).run(items):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.get("/api/workflow/{digest}.svg")
+def get_workflow_svg(digest: str, request: Request) -> Response:
+    """
+    Pre-rendered workflow diagram. The URL embeds the content hash, so the
+    image is cached by browsers as immutable; ETag covers revalidation.
+    """
+    if workflow_diagram.svg is None or digest != workflow_diagram.digest:
+        raise HTTPException(status_code=404, detail="Unknown diagram")
+    etag = f'"{workflow_diagram.digest}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(workflow_diagram.svg, media_type="image/svg+xml", headers=headers)
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serializes a DTO once, with pydantic-core's encoder (no jsonable_encoder pass)."""
+    return Response(model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+@app.post("/api/runs", status_code=202, response_model=RunStatusDTO)
+async def submit_run(payload: ArchitectureRequest, request: Request) -> Response:
+    """
+    Queues a pipeline run and returns its id at once (async: the job pool
+    lives on the event loop); follow it with
+    GET /api/runs/{run_id} or its events stream.
+    Rejected with 429/503 and Retry-After under rate limit or overload.
+    `"profile": true` or an `X-Profile: 1` header records a sampling profile
+    of the run, served by GET /api/runs/{run_id}/profile.
+    """
+    await admission.check(client_key(request), backlog=await job_manager.queued())
+    if request.headers.get("x-profile", "").lower() in ("1", "true"):
+        payload = payload.model_copy(update={"profile": True})
+    job = await job_manager.submit(payload)
+    response = json_response(job.to_dto(), status_code=202)
+    response.headers["Location"] = f"/api/runs/{job.run_id}"
+    return response
+
+
+@app.get("/api/runs/{run_id}", response_model=RunStatusDTO)
+async def get_run(run_id: str) -> Response:
+    """
+    Status and result of a run; runs no longer in memory are read from the history.
+    """
+    job = await job_manager.get(run_id)
+    if job is not None:
+        return json_response(job.to_dto())
+    record = await asyncio.to_thread(run_history.get, run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return json_response(RunStatusDTO(
+        run_id=run_id,
+        status="partial" if record.result and record.result.partial else record.status,
+        created_at=record.created_at - record.duration_s,
+        finished_at=record.created_at,
+        result=record.result,
+        error=record.error,
+    ))
+
+
+@app.get("/api/runs/{run_id}/profile")
+async def get_run_profile(run_id: str) -> Response:
+    """
+    Sampling profile of a finished run, as collapsed stacks
+    (flamegraph.pl, speedscope, ...).
+    """
+    record = await asyncio.to_thread(run_history.get, run_id)
+    if record is None or not record.profile or not os.path.exists(record.profile):
+        raise HTTPException(status_code=404, detail=f"No profile for run {run_id}")
+    return FileResponse(record.profile, media_type="text/plain", filename=f"{run_id}.folded")
+
+
+@app.get("/api/runs/{run_id}/events")
+async def get_run_events(run_id: str, request: Request) -> StreamingResponse:
+    """
+    Server-sent events of a run: queued, run-started, node-started,
+    node-finished, tokens (one per LLM call) and run-finished.
+    Reconnecting clients resume after their Last-Event-ID.
+    """
+    if await job_manager.get(run_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    try:
+        after = int(request.headers.get("last-event-id", -1))
+    except ValueError:
+        after = -1  # malformed id: replay from the start
+
+    async def stream():
+        async for event in job_manager.events(run_id, after):
+            yield sse(event)
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.post("/api/runs/{run_id}/resume", status_code=202, response_model=RunStatusDTO)
+async def resume_run(run_id: str, request: Request) -> Response:
+    """
+    Queues an interrupted run again; it restarts at the node that failed.
+    """
+    job = await job_manager.get(run_id)
+    if (job is not None and not job.done) or not checkpoints.exists(run_id):
+        raise HTTPException(status_code=409, detail=f"Run {run_id} is not resumable")
+    await admission.check(client_key(request), backlog=await job_manager.queued())
+    job = await job_manager.resume(run_id)
+    return json_response(job.to_dto(), status_code=202)
+
+
+@app.delete("/api/runs/{run_id}", response_model=RunStatusDTO)
+async def delete_run(run_id: str) -> Response:
+    """
+    Cancels a queued or running run (its in-flight LLM calls included).
+    """
+    if not await job_manager.cancel(run_id):
+        raise HTTPException(status_code=409, detail=f"Run {run_id} is not running")
+    return json_response((await job_manager.get(run_id)).to_dto())
+
+
+@app.get("/api/history", response_model=RunPageDTO)
+def list_history(
+    limit: int = Query(default=50, ge=1, le=500),
+    before: Optional[int] = None,
+    status: Optional[str] = None,
+    requirements: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> Response:
+    """
+    Past runs, newest first. Pass `next_cursor` back as `before` for the next page;
+    `requirements` filters on runs of the same requirements text, `since`/`until`
+    (epoch seconds, until excluded) on the time the runs were recorded.
+    """
+    items, cursor = run_history.list_runs(
+        limit=limit,
+        before=before,
+        status=status,
+        requirements_hash=requirements_hash(requirements) if requirements else None,
+        since=since,
+        until=until,
+    )
+    return json_response(RunPageDTO(items=items, next_cursor=cursor))
+
+
+@app.get("/api/history/{run_id}", response_model=RunRecordDTO)
+def get_history(run_id: str) -> Response:
+    """
+    A stored run: request, final state, per-node timings and models.
+    """
+    record = run_history.get(run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return json_response(record)
+
 # Integrate NiceGUI
 
 @ui.page('/')
@@ -93,6 +352,8 @@ def index_page() -> None:
     """
     Unique entry point for each web client.
     """
+    UI_SESSIONS.inc()
+    ui.context.client.on_delete(UI_SESSIONS.dec)
     TheArchitectApp()
 
 ui.run_with(
@@ -112,6 +373,10 @@ def start_app() -> None:
         except RuntimeError:
             pass
 
+    if config.WORKERS > 1:
+        start_workers(config.WORKERS)
+        return
+
     # Use uvicorn to serve the FastAPI app (which now contains NiceGUI)
     uvicorn.run(
         "main:app", 
@@ -121,5 +386,45 @@ def start_app() -> None:
         workers=1
     )
 
+
+def start_workers(count: int, base_port: int = 8080) -> None:
+    """
+    Multi-worker mode: one uvicorn process per worker, each on its own port
+    (8080, 8081, ...). NiceGUI sessions live in their worker's memory, so a
+    proxy with sticky sessions must front them (infra/traefik-workers.yaml);
+    run state, job queue, node cache and rate limits go to the shared SQLite
+    state, and MAX_CONCURRENT_RUNS is split between the workers. Metrics stay
+    per worker: each port is its own scrape target (infra/prometheus-workers.yaml).
+    """
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.dirname(os.path.dirname(app_dir))
+    if count > config.MAX_CONCURRENT_RUNS:
+        logger.warning(
+            f"⚠️ {count} workers for MAX_CONCURRENT_RUNS={config.MAX_CONCURRENT_RUNS}:"
+            f" each worker still runs one pipeline at a time, up to {count} at once"
+        )
+    env = {
+        **os.environ,
+        "STATE_BACKEND": "sqlite",
+        # The workers share MAX_CONCURRENT_RUNS (uvicorn processes never start workers)
+        "WORKERS": str(count),
+        "PYTHONPATH": os.pathsep.join(filter(None, [root_dir, os.environ.get("PYTHONPATH")])),
+    }
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", str(port)],
+            cwd=app_dir,
+            env=env,
+        )
+        for port in range(base_port, base_port + count)
+    ]
+    logger.info(f"🚀 {count} workers on ports {base_port}-{base_port + count - 1}")
+    try:
+        for process in processes:
+            process.wait()
+    finally:
+        for process in processes:
+            process.terminate()
+
 if __name__ in {"__main__", "__mp_main__"}:
     start_app()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import hashlib
+import logging
+import os
+from functools import cached_property
+from typing import Optional
+
+import httpx
+from pydantic_graph import Graph
+
+from apps.architect.domain.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowDiagram:
+    """
+    Mermaid diagram of the workflow graph, generated once per process.
+    Optionally pre-rendered to SVG (through mermaid.ink, cached on disk by
+    content hash) so that browsers load a static, immutable image instead
+    of rendering the diagram client-side on every visit.
+    """
+
+    def __init__(self, graph: Graph, start_node: type) -> None:
+        self.graph = graph
+        self.start_node = start_node
+        self.svg: Optional[bytes] = None
+
+    @cached_property
+    def mermaid(self) -> str:
+        return self.graph.mermaid_code(
+            start_node=self.start_node, title=False, direction="LR", infer_name=False
+        )
+
+    @cached_property
+    def digest(self) -> str:
+        """Content hash of the diagram: its ETag, and part of the SVG URL."""
+        return hashlib.sha256(self.mermaid.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def svg_url(self) -> Optional[str]:
+        return f"/api/workflow/{self.digest}.svg" if self.svg else None
+
+    def prerender(self) -> None:
+        """Loads the SVG from the disk cache, or renders and caches it. Blocking."""
+        path = os.path.join(config.DATA_DIR, "diagrams", f"{self.digest}.svg")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self.svg = f.read()
+            return
+        try:
+            svg = self.graph.mermaid_image(
+                start_node=self.start_node, image_type="svg", direction="LR", infer_name=False
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Workflow diagram not pre-rendered, browsers will render it: {e}")
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(svg)
+        self.svg = svg
+        logger.info(f"🖼️ Workflow diagram pre-rendered ({len(svg)} bytes)")
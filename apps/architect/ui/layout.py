@@ -1,6 +1,8 @@
 from nicegui import ui
 from typing import Callable, Dict, Any
 
+from apps.architect.ui.diagram import WorkflowDiagram
+
 
 class ArchitectLayout:
     def __init__(self, on_start: Callable):
@@ -55,27 +57,17 @@ class ArchitectLayout:
                 ui.label("System Architecture").classes("text-h6 mb-2")
                 self.graph_card = ui.column().classes("w-full items-center")
 
-    def update_graph(self, compiled_graph):
+    def update_graph(self, diagram: WorkflowDiagram):
         """
-        Updates the UI with the actual Mermaid diagram from LangGraph
+        Shows the workflow diagram precomputed at startup: the cached SVG
+        when it was pre-rendered, else the Mermaid text rendered by the browser.
         """
         self.graph_card.clear()
         with self.graph_card:
-            try:
-                # Fix: draw_mermaid() for text output doesn't need draw_method
-                # It returns the Mermaid string directly
-                mermaid_code = compiled_graph.get_graph().draw_mermaid()
-                mermaid_code = mermaid_code.replace("graph TD", "graph LR").replace(
-                    "graph TB", "graph LR"
-                )
-                ui.mermaid(mermaid_code).classes("w-full")
-            except Exception as e:
-                # Fallback if Mermaid fails: display as ASCII
-                try:
-                    ascii_graph = compiled_graph.get_graph().draw_ascii()
-                    ui.pre(ascii_graph).classes("text-xs")
-                except:
-                    ui.label(f"Error loading graph: {str(e)}").classes("text-red")
+            if diagram.svg_url:
+                ui.image(diagram.svg_url).classes("w-full")
+            else:
+                ui.mermaid(diagram.mermaid).classes("w-full")
 
     def toggle_loader(self, visible: bool):
         self.spinner.set_visibility(visible)
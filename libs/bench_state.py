@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-run copying and validation overhead of the graph state.
+
+"dict" replays the former flow: every node dumps its output into loose dicts,
+the controller validates them into the DTO, and the UI dumps the DTO again.
+"typed" is the current flow: typed models travel through the state into the
+DTO untouched and are serialized once at the edge.
+
+Usage:
+python -m libs.bench_state --code-kb 256 --runs 200
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from apps.architect.domain.models import ADR, ArchitectureSpecs, CadrageReport, SOLIDCode
+from apps.architect.dto.contracts import PMAnalysisReport
+from apps.architect.dto.states import AgentStateDTO
+
+
+class DictStateDTO(BaseModel):
+    """The former DTO, with dict fields."""
+    requirements: str
+    charter_data: Dict[str, Any] = Field(default_factory=dict)
+    analysis_report: Optional[Dict[str, Any]] = None
+    architecture_specs: Optional[Dict[str, Any]] = None
+    final_code: Optional[Dict[str, Any]] = None
+
+
+def outputs(code_kb: int) -> Dict[str, BaseModel]:
+    """Agent outputs of one run; the generated code dominates the payload."""
+    method = "    x = 1\n" * (code_kb * 1024 // 10)
+    return {
+        "charter_data": PMAnalysisReport(is_smart=True, content="A CRM", gaps=["budget"]),
+        "analysis_report": CadrageReport(
+            needs=["CRM"] * 20, constraints=["on-prem"] * 20, actors=["sales"] * 20,
+            risks=["scope"] * 20, clarification_questions=["who?"] * 20,
+        ),
+        "architecture_specs": ArchitectureSpecs(
+            diagram="graph TD\n A --> B",
+            adr=ADR(title="t", context="c", decision="d", consequences=["p", "c"]),
+        ),
+        "final_code": SOLIDCode(
+            class_name="Crm",
+            methods={f"m{i}": method for i in range(4)},
+            unit_tests={f"t{i}": method for i in range(4)},
+        ),
+    }
+
+
+def dict_run(models: Dict[str, BaseModel]) -> str:
+    state = {key: model.model_dump() for key, model in models.items()}  # nodes
+    dto = DictStateDTO(requirements="A CRM", **state)  # controller
+    return json.dumps(dto.model_dump())  # UI / API edge
+
+
+def typed_run(models: Dict[str, BaseModel]) -> str:
+    dto = AgentStateDTO(requirements="A CRM", **models)
+    return dto.model_dump_json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="State copy/validation overhead per run.")
+    parser.add_argument("--code-kb", type=int, default=256, help="Size of each generated method.")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    models = outputs(args.code_kb)
+    assert json.loads(dict_run(models)).items() <= json.loads(typed_run(models)).items()
+
+    print(f"📏 {len(typed_run(models)) / 1024:.0f} KiB of state per run")
+    for name, run in (("dict", dict_run), ("typed", typed_run)):
+        best = min(timeit.repeat(lambda: run(models), number=args.runs, repeat=3)) / args.runs
+        print(f"⏱️ {name:>5}: {best * 1e6:,.0f} µs/run")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,29 @@ Production-ready with strict .gitignore support via pathspec.
 
 Usage:
 python libs/code_mapper.py --to-json
+python libs/code_mapper.py --to-json --incremental --workers 16
 python libs/code_mapper.py --from-json libs/project_structure.json
 """
 
 import os
 import json
+import hashlib
 import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
 import pathspec
 
 # --- Default Configurations ---
 DEFAULT_OUTPUT = os.path.join("libs", "project_structure.json")
 DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# File reads are I/O bound: more threads than cores, as ThreadPoolExecutor does
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+READ_BATCH = 32
 
 
 # --- Utility Functions ---
-def read_file_content(file_path: str) -> str:
-    """Reads the content of a file."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
-
-
 def write_file(file_path: str, content: str) -> None:
     """Writes a file, creating parent directories if necessary."""
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -53,6 +56,43 @@ def get_gitignore_spec(root_dir: str) -> pathspec.PathSpec:
     return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
 
 
+# --- Change Manifest ---
+def manifest_path(output_json_path: str) -> str:
+    """The manifest lives next to the JSON it describes."""
+    return f"{os.path.splitext(output_json_path)[0]}.manifest.json"
+
+
+def load_previous(output_json_path: str, root_dir: str) -> Dict[str, dict]:
+    """
+    Manifest entries of the last export, keyed by path: size, mtime_ns,
+    sha256 and the byte span (offset, length) of the file's entry in the JSON.
+    Binary files have no sha256 nor span. Empty when the manifest is missing,
+    was made from another root, or no longer matches the JSON on disk.
+    """
+    try:
+        with open(manifest_path(output_json_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = os.stat(output_json_path)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("root") != os.path.abspath(root_dir):
+        return {}
+    if manifest.get("output") != {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}:
+        return {}
+    return manifest.get("files", {})
+
+
+def write_manifest(output_json_path: str, root_dir: str, entries: Dict[str, dict]) -> None:
+    stat = os.stat(output_json_path)
+    manifest = {
+        "root": os.path.abspath(root_dir),
+        "output": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "files": entries,
+    }
+    with open(manifest_path(output_json_path), "w", encoding="utf-8") as f:
+        f.write(json.dumps(manifest, separators=(",", ":")))
+
+
 # --- JSON → Code ---
 def generate_code_from_json(json_path: str) -> None:
     """Generates files from a JSON structure."""
@@ -70,16 +110,141 @@ def generate_code_from_json(json_path: str) -> None:
 
 
 # --- Code → JSON ---
-def generate_json_from_code(root_dir: str, output_json_path: str) -> None:
+# One file of {"files": [...]} as json.dump(..., indent=2) lays it out
+ENTRY_TEMPLATE = '    {{\n      "path": {path},\n      "content": {content}\n    }}'
+
+
+def encode_entry(path: str, content: str) -> bytes:
+    return ENTRY_TEMPLATE.format(
+        path=json.dumps(path, ensure_ascii=False),
+        content=json.dumps(content, ensure_ascii=False),
+    ).encode("utf-8")
+
+
+def read_entry(relative_path: str, file_path: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Reads a file in one pass (pool thread): its sha256 and JSON entry, or
+    (None, None) for a binary (non UTF-8) file. Newlines are translated as
+    a text-mode read does; the hash is the one of the raw bytes.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None, None
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return hashlib.sha256(data).hexdigest(), encode_entry(relative_path, content)
+
+
+def read_batch(batch: List[Tuple[str, str, dict]]) -> List[Tuple[str, dict, Optional[bytes]]]:
+    """
+    Reads the candidates of a batch without a sha256 (pool thread) and returns
+    (path, meta, entry) for each: entry is None for the files the manifest
+    vouches for, meta["sha256"] None for binary files. Unreadable files are
+    left out.
+    """
+    results = []
+    for relative_path, file_path, meta in batch:
+        if "sha256" in meta:
+            results.append((relative_path, meta, None))
+            continue
+        try:
+            sha256, entry = read_entry(relative_path, file_path)
+        except PermissionError:
+            continue
+        except OSError as e:
+            print(f"⚠️ Error reading {relative_path}: {e}")
+            continue
+        results.append((relative_path, {**meta, "sha256": sha256}, entry))
+    return results
+
+
+def read_in_order(
+    candidates: List[Tuple[str, str, dict]], workers: int
+) -> Iterator[Tuple[str, dict, Optional[bytes]]]:
+    """
+    Reads the candidates on a thread pool, by batches of READ_BATCH files (a
+    future per file costs more than reading a small one), at most `workers * 2`
+    batches ahead of the consumer, and yields the results in scan order.
+    """
+    window: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(candidates), READ_BATCH):
+            window.append(pool.submit(read_batch, candidates[start:start + READ_BATCH]))
+            if len(window) >= workers * 2:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def write_entries(
+    output_json_path: str,
+    entries: Iterator[Tuple[str, dict, Optional[bytes]]],
+    previous: Dict[str, dict],
+    exported: List[str],
+) -> Tuple[Dict[str, dict], bool]:
+    """
+    Streams the entries to the JSON, byte for byte what json.dump(indent=2)
+    gives. Entries without bytes are copied from their span in the previous
+    JSON. The new JSON replaces it only when it differs (touched files can
+    turn out unchanged). Returns the manifest and whether the JSON changed.
+    """
+    manifest: Dict[str, dict] = {}
+    changed = not previous
+    count = 0
+    tmp_path = f"{output_json_path}.tmp"
+    with open(tmp_path, "wb") as out, open(output_json_path if previous else os.devnull, "rb") as old:
+        out.write(b'{\n  "files": [')
+        for path, meta, entry in entries:
+            manifest[path] = meta
+            if meta["sha256"] is None:
+                continue  # binary: remembered, not exported
+            if entry is None:
+                old.seek(meta["offset"])
+                entry = old.read(meta["length"])
+            elif meta["sha256"] != previous.get(path, {}).get("sha256"):
+                changed = True
+            changed |= count >= len(exported) or exported[count] != path
+            out.write(b",\n" if count else b"\n")
+            manifest[path] = {**meta, "offset": out.tell(), "length": len(entry)}
+            out.write(entry)
+            count += 1
+        out.write(b"\n  ]\n}" if count else b"]\n}")
+    changed |= count != len(exported)
+
+    if changed:
+        os.replace(tmp_path, output_json_path)
+    else:
+        os.remove(tmp_path)  # same bytes, spans included: keep the JSON the manifest matches
+    return manifest, changed
+
+
+def generate_json_from_code(
+    root_dir: str, output_json_path: str, incremental: bool = False, workers: int = DEFAULT_WORKERS
+) -> None:
     """
     Generates a JSON describing the structure of a code directory,
     respecting .gitignore strictly and excluding binary files.
+    A manifest (size, mtime, hash and position of each file in the JSON) is
+    written next to it. In incremental mode, files whose size and mtime match
+    the manifest are not read: their entry is copied from the previous JSON,
+    which is left untouched when no file was added, changed or removed.
+    Files are read on a pool of `workers` threads and streamed to the JSON in
+    scan order, so memory does not grow with the size of the tree.
     """
-    files = []
+    candidates: List[Tuple[str, str, dict]] = []
+    previous = load_previous(output_json_path, root_dir) if incremental else {}
     spec = get_gitignore_spec(root_dir)
 
     # Files to always exclude regardless of .gitignore
-    internal_excludes = {".gitignore", "LICENSE", os.path.basename(output_json_path)}
+    internal_excludes = {
+        ".gitignore",
+        "LICENSE",
+        os.path.basename(output_json_path),
+        os.path.basename(manifest_path(output_json_path)),
+    }
 
     print(f"🔍 Scanning: {root_dir}")
     print(f"📁 Target: {output_json_path}")
@@ -98,30 +263,43 @@ def generate_json_from_code(root_dir: str, output_json_path: str) -> None:
                 continue
 
             file_path = os.path.join(dirpath, filename)
-            relative_path = os.path.relpath(file_path, root_dir)
+            relative_path = filename if relative_dir == "." else os.path.join(relative_dir, filename)
 
             if spec.match_file(relative_path):
                 continue
 
             try:
-                # Binary check: try reading as text
-                with open(file_path, "tr", encoding="utf-8") as check_file:
-                    check_file.read(1024)
-
-                content = read_file_content(file_path)
-                files.append({"path": relative_path, "content": content})
-            except (UnicodeDecodeError, PermissionError):
-                continue
+                stat = os.stat(file_path)
             except OSError as e:
                 print(f"⚠️ Error reading {relative_path}: {e}")
+                continue
+            meta = previous.get(relative_path)
+            if meta is None or (meta["size"], meta["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                # No sha256 yet: to read
+                meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            candidates.append((relative_path, file_path, meta))
 
-    project_data = {"files": files}
     os.makedirs(os.path.dirname(os.path.abspath(output_json_path)), exist_ok=True)
 
-    with open(output_json_path, "w", encoding="utf-8") as f:
-        json.dump(project_data, f, indent=2, ensure_ascii=False)
+    # Entries of the previous JSON, in file order
+    exported = [path for _, path in sorted(
+        (meta["offset"], path) for path, meta in previous.items() if meta["sha256"] is not None
+    )]
+    to_read = sum("sha256" not in meta for _, _, meta in candidates)
+    texts = [path for path, _, meta in candidates if meta.get("sha256", "") is not None]
+
+    if previous and not to_read and texts == exported:
+        # Nothing to read, same files in the same order: the JSON already holds them
+        manifest = {path: meta for path, _, meta in candidates}
+        changed = False
+    else:
+        manifest, changed = write_entries(output_json_path, read_in_order(candidates, workers), previous, exported)
+    # After the JSON: a manifest never describes content that was not written
+    write_manifest(output_json_path, root_dir, manifest)
 
-    print(f"✅ JSON generated successfully with {len(files)} files.")
+    count = sum(meta["sha256"] is not None for meta in manifest.values())
+    state = "generated successfully" if changed else "up to date"
+    print(f"✅ JSON {state} with {count} files ({to_read} read).")
 
 
 # --- CLI ---
@@ -131,6 +309,10 @@ def main():
         "--from-json", nargs="?", const=DEFAULT_OUTPUT, help="JSON to Code."
     )
     parser.add_argument("--to-json", nargs="*", help="Code to JSON [ROOT] [OUTPUT].")
+    parser.add_argument(
+        "--incremental", action="store_true", help="Only read files changed since the last --to-json."
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Threads reading the files.")
 
     args = parser.parse_args()
 
@@ -139,7 +321,7 @@ def main():
     elif args.to_json is not None:
         root = args.to_json[0] if len(args.to_json) > 0 else DEFAULT_ROOT
         output = args.to_json[1] if len(args.to_json) > 1 else DEFAULT_OUTPUT
-        generate_json_from_code(root, output)
+        generate_json_from_code(root, output, incremental=args.incremental, workers=max(1, args.workers))
     else:
         parser.print_help()
 
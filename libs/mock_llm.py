@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Mock LLM: an offline stand-in for Ollama speaking the OpenAI chat-completions API.
+Answers are valid against the requested output schema (response_format or
+output tool), with reproducible latency, throughput and error profiles.
+
+Usage:
+python libs/mock_llm.py --profile nemotron-30b-gpu --port 11434
+OLLAMA_URL=http://localhost:11434 make ...
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+
+# --- Timing Profiles ---
+@dataclass(frozen=True)
+class MockProfile:
+    """Model timing: time to first token, decoding speed and failure rate."""
+    ttft_s: float
+    tokens_per_s: float
+    error_rate: float = 0.0
+
+
+PROFILES: Dict[str, MockProfile] = {
+    "instant": MockProfile(ttft_s=0.0, tokens_per_s=0.0),
+    "qwen3-0.6b-cpu": MockProfile(ttft_s=0.3, tokens_per_s=40.0),
+    "nemotron-30b-gpu": MockProfile(ttft_s=1.5, tokens_per_s=25.0),
+    "flaky": MockProfile(ttft_s=0.2, tokens_per_s=50.0, error_rate=0.2),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# --- Schema-valid Payloads ---
+class SchemaFaker:
+    """Builds deterministic JSON values matching a JSON schema."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def build(self, schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None, name: str = "value") -> Any:
+        defs = defs if defs is not None else schema.get("$defs", {})
+        if "$ref" in schema:
+            return self.build(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, name)
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+                return self.build(options[0], defs, name)
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if "const" in schema:
+            return schema["const"]
+
+        kind = schema.get("type", "object")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "string")
+
+        if kind == "object":
+            properties = schema.get("properties", {})
+            return {key: self.build(sub, defs, key) for key, sub in properties.items()}
+        if kind == "array":
+            low = schema.get("minItems", 1)
+            high = max(low, schema.get("maxItems", 3))
+            return [
+                self.build(schema.get("items", {"type": "string"}), defs, name)
+                for _ in range(self.rng.randint(low, high))
+            ]
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "integer":
+            return self.rng.randint(schema.get("minimum", 0), schema.get("maximum", 100))
+        if kind == "number":
+            return round(self.rng.uniform(schema.get("minimum", 0), schema.get("maximum", 100)), 2)
+        return f"Mock {name.replace('_', ' ')} {self.rng.randint(1, 999)}"
+
+
+# --- Server ---
+def create_app(profile: MockProfile = PROFILES["instant"], seed: int = 0) -> FastAPI:
+    """Mock Ollama app (OpenAI-compatible /v1 plus the native endpoints we call)."""
+    app = FastAPI(title="Mock LLM")
+    rng = random.Random(seed)
+    faker = SchemaFaker(rng)
+    models = ["qwen3:0.6b", "nemotron-3-nano:30b"]
+    # Loaded models and their keep-alive (seconds, -1 = until unloaded), as Ollama tracks them
+    resident: Dict[str, int] = {}
+
+    def answer(body: Dict[str, Any]) -> Dict[str, Any]:
+        """Chooses the assistant message: native JSON, output tool call or text."""
+        response_format = body.get("response_format") or {}
+        tools = body.get("tools") or []
+
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            return {"content": json.dumps(faker.build(schema))}
+        if response_format.get("type") == "json_object":
+            return {"content": "{}"}
+        if tools:
+            function = tools[0]["function"]
+            arguments = json.dumps(faker.build(function.get("parameters", {})))
+            return {"tool_call": {"name": function["name"], "arguments": arguments}}
+        return {"content": "Mock answer."}
+
+    def completion_delay(tokens: int) -> float:
+        decode = tokens / profile.tokens_per_s if profile.tokens_per_s else 0.0
+        return profile.ttft_s + decode
+
+    @app.get("/", response_class=PlainTextResponse)
+    async def root() -> str:
+        return "Ollama is running"
+
+    @app.get("/api/tags")
+    async def tags() -> Dict[str, Any]:
+        return {"models": [{"name": m, "model": m} for m in models]}
+
+    @app.get("/api/ps")
+    async def ps() -> Dict[str, Any]:
+        def expires_at(keep_alive: int) -> Optional[str]:
+            if keep_alive < 0:
+                return None
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + keep_alive))
+
+        return {"models": [
+            {"name": m, "model": m, "expires_at": expires_at(k), "size_vram": 0} for m, k in resident.items()
+        ]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request) -> Dict[str, Any]:
+        # An empty generate loads the model, or unloads it with keep_alive=0
+        body = await request.json()
+        keep_alive = int(body.get("keep_alive", 300))
+        if keep_alive == 0:
+            resident.pop(body.get("model"), None)
+        else:
+            resident[body.get("model")] = keep_alive
+        return {"model": body.get("model"), "response": "", "done": True}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        resident[body.get("model")] = 300  # chat requests reset the keep-alive to the default
+        if rng.random() < profile.error_rate:
+            await asyncio.sleep(profile.ttft_s)
+            return JSONResponse(
+                {"error": {"message": "mock overload", "type": "server_error"}}, status_code=503
+            )
+
+        message = answer(body)
+        text = message.get("content") or message["tool_call"]["arguments"]
+        usage = {
+            "prompt_tokens": estimate_tokens(json.dumps(body.get("messages", []))),
+            "completion_tokens": estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", models[0])
+
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(completion_id, model, message, usage), media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(completion_delay(usage["completion_tokens"]))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": to_openai(message), "finish_reason": finish_reason(message)}],
+            "usage": usage,
+        }
+
+    async def stream_chunks(
+        completion_id: str, model: str, message: Dict[str, Any], usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """SSE chunks paced by the profile: first token after ttft, then tokens_per_s."""
+
+        def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+            return event([{"index": 0, "delta": delta, "finish_reason": finish}])
+
+        await asyncio.sleep(profile.ttft_s)
+        tool_call = message.get("tool_call")
+        text = message.get("content") or tool_call["arguments"]
+        pieces = [text[i : i + 4] for i in range(0, len(text), 4)]
+        pause = 1 / profile.tokens_per_s if profile.tokens_per_s else 0.0
+
+        if tool_call:
+            yield chunk({"role": "assistant", "tool_calls": [{
+                "index": 0, "id": f"call_{completion_id}", "type": "function",
+                "function": {"name": tool_call["name"], "arguments": ""},
+            }]})
+        else:
+            yield chunk({"role": "assistant", "content": ""})
+
+        for piece in pieces:
+            if pause:
+                await asyncio.sleep(pause)
+            if tool_call:
+                yield chunk({"tool_calls": [{"index": 0, "function": {"arguments": piece}}]})
+            else:
+                yield chunk({"content": piece})
+
+        yield chunk({}, finish_reason(message))
+        yield event([], usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return app
+
+
+def to_openai(message: Dict[str, Any]) -> Dict[str, Any]:
+    tool_call = message.get("tool_call")
+    if not tool_call:
+        return {"role": "assistant", "content": message["content"]}
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": f"call_{uuid.uuid4().hex[:8]}", "type": "function", "function": tool_call}],
+    }
+
+
+def finish_reason(message: Dict[str, Any]) -> str:
+    return "tool_calls" if message.get("tool_call") else "stop"
+
+
+# --- CLI ---
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock LLM: offline OpenAI-compatible Ollama stand-in.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--ttft", type=float, help="Override time to first token (s).")
+    parser.add_argument("--tps", type=float, help="Override tokens per second.")
+    parser.add_argument("--error-rate", type=float, help="Override failure probability.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = PROFILES[args.profile]
+    profile = MockProfile(
+        ttft_s=base.ttft_s if args.ttft is None else args.ttft,
+        tokens_per_s=base.tokens_per_s if args.tps is None else args.tps,
+        error_rate=base.error_rate if args.error_rate is None else args.error_rate,
+    )
+    print(f"🤖 Mock LLM on {args.host}:{args.port} with {profile}")
+    uvicorn.run(create_app(profile, args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Startup profile of the app entry point: import time per module (parsed from
+`python -X importtime`), aggregated per top-level package, and optionally the
+time until a freshly started server answers its first request.
+
+Usage:
+python -m libs.startup_profile --top 25
+python -m libs.startup_profile --serve
+"""
+
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "apps", "architect")
+# Tracing export would only add network noise to the measure
+ENV = {**os.environ, "PYTHONPATH": ROOT, "OTEL_SDK_DISABLED": "true"}
+
+IMPORT_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+@dataclass
+class ModuleImport:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".")[0]
+
+
+def parse_importtime(stderr: str) -> List[ModuleImport]:
+    """Rows of -X importtime; the indentation gives the nesting depth."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append(ModuleImport(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def profile_imports(module: str) -> List[ModuleImport]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=ENV, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def by_package(rows: List[ModuleImport]) -> Dict[str, int]:
+    """Self time summed per top-level package (the cost of depending on it)."""
+    totals: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        totals[row.package] += row.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def time_to_first_request(timeout_s: float = 60.0) -> float:
+    """Seconds from spawning the server to its first 200 on /api/status."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=APP_DIR, env={**ENV, "OLLAMA_WARMUP": "false"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout_s:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/status", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None:
+                raise SystemExit("❌ The server exited before answering")
+            time.sleep(0.05)
+        raise SystemExit(f"❌ No answer within {timeout_s}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# --- CLI ---
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time per module of the app entry point.")
+    parser.add_argument("--module", default="apps.architect.main")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table.")
+    parser.add_argument("--serve", action="store_true", help="Also measure the time to first request.")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total = next((r.cumulative_us for r in rows if r.name == args.module), sum(r.self_us for r in rows))
+    print(f"📦 import {args.module}: {total / 1e3:,.0f} ms, {len(rows)} modules")
+
+    print(f"\n⏱️ Slowest modules (cumulative, top {args.top})")
+    for row in sorted(rows, key=lambda r: r.cumulative_us, reverse=True)[: args.top]:
+        print(f"{row.cumulative_us / 1e3:>9,.1f} ms {row.self_us / 1e3:>8,.1f} ms self  {row.name}")
+
+    print(f"\n📚 Packages (self time, top {args.top})")
+    for package, self_us in list(by_package(rows).items())[: args.top]:
+        print(f"{self_us / 1e3:>9,.1f} ms  {package}")
+
+    if args.serve:
+        print(f"\n🚀 Time to first request: {time_to_first_request():.2f}s")
+
+
+if __name__ == "__main__":
+    main()
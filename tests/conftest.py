@@ -19,3 +19,29 @@ def client() -> Generator[httpx.Client, None, None]:
     server_url = os.getenv("APP_URL", "http://localhost:8080")
     with httpx.Client(base_url=server_url, timeout=5.0) as client:
         yield client
+
+
+@pytest.fixture(scope="session")
+def mock_llm_url() -> Generator[str, None, None]:
+    """Offline OpenAI-compatible LLM (libs/mock_llm.py) served on a free local port."""
+    import threading
+    import time
+    import uvicorn
+    from libs.mock_llm import create_app
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    yield f"http://127.0.0.1:{port}"
+
+    server.should_exit = True
+    thread.join(timeout=5)
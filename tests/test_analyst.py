@@ -1,6 +1,8 @@
 import pytest
 from apps.architect.agents.nodes.analyst import AnalystAgent
+from apps.architect.domain.config import config
 from apps.architect.domain.models import CadrageReport
+from apps.architect.domain.sections import estimate_tokens, split_sections
 
 import httpx
 
@@ -39,4 +41,56 @@ class TestAnalystAgent:
         #  --> construct an other test ? 1 test = 1 assert
         assert any("validation" in n.lower() for n in report.needs)
         assert any("scope" in r.lower() for r in report.risks)
-        assert len(report.actors) >= 0  # Should be a list, even if empty
\ No newline at end of file
+        assert len(report.actors) >= 0  # Should be a list, even if empty
+
+class TestLongInputMode:
+
+    def test_split_sections_respects_budget(self):
+        cdc = "\n\n".join(f"Paragraph {i}: " + "word " * 200 for i in range(20))
+
+        sections = split_sections(cdc, max_tokens=600)
+
+        assert len(sections) > 1
+        assert all(estimate_tokens(s) <= 600 for s in sections)
+        assert "".join(sections).count("Paragraph") == 20
+
+    def test_estimate_matches_the_section_budget(self):
+        assert estimate_tokens("x" * 4000) == 1000
+        assert estimate_tokens("x" * 4001) == 1001
+        assert split_sections("x" * 4000, max_tokens=1000) == ["x" * 4000]
+
+    def test_merge_deduplicates_in_order(self):
+        first = CadrageReport(
+            needs=["Data validation", "Reporting"], constraints=["Budget"],
+            actors=["Client"], risks=["Scope creep."], clarification_questions=[],
+        )
+        second = CadrageReport(
+            needs=["data  validation", "Alerting"], constraints=["budget"],
+            actors=["Operator"], risks=["scope creep"], clarification_questions=["SLA?"],
+        )
+
+        merged = CadrageReport.merge([first, second])
+
+        assert merged.needs == ["Data validation", "Reporting", "Alerting"]
+        assert merged.constraints == ["Budget"]
+        assert merged.risks == ["Scope creep."]
+        assert merged.clarification_questions == ["SLA?"]
+
+    async def test_long_cdc_is_mapped_and_reduced(self, monkeypatch):
+        monkeypatch.setattr(config, "ANALYST_SECTION_TOKENS", 100)
+        agent = AnalystAgent()
+        prompts = []
+
+        async def fake_run(prompt: str) -> CadrageReport:
+            prompts.append(prompt)
+            return CadrageReport(
+                needs=["Shared need"], constraints=[], actors=[],
+                risks=[f"Risk {len(prompts)}"], clarification_questions=[],
+            )
+
+        monkeypatch.setattr(agent._agent, "run", fake_run)
+        report = await agent.analyze("\n\n".join(["lorem ipsum " * 30] * 4))
+
+        assert len(prompts) == 4
+        assert report.needs == ["Shared need"]
+        assert len(report.risks) == 4
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from libs import code_mapper
+from libs.code_mapper import generate_json_from_code, manifest_path
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "a.py").write_text("print('a')\n")
+    (root / "pkg" / "b.py").write_text("print('b')\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe")
+    (root / ".gitignore").write_text("build/\n")
+    (root / "build").mkdir()
+    (root / "build" / "out.py").write_text("ignored")
+    return root
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths read by the mapper."""
+    seen = []
+    read_entry = code_mapper.read_entry
+
+    def spy(relative_path, file_path):
+        seen.append(os.path.basename(file_path))
+        return read_entry(relative_path, file_path)
+
+    monkeypatch.setattr(code_mapper, "read_entry", spy)
+    return seen
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return {item["path"]: item["content"] for item in json.load(f)["files"]}
+
+
+def test_incremental_export_only_reads_changed_files(tree, tmp_path, reads):
+    output = str(tmp_path / "structure.json")
+    generate_json_from_code(str(tree), output, incremental=True)
+    assert sorted(reads) == ["a.py", "b.py", "logo.png"]
+    full = open(output, encoding="utf-8").read()
+
+    # Nothing changed: no file read, the JSON is kept as is
+    reads.clear()
+    generate_json_from_code(str(tree), output, incremental=True)
+    assert reads == [] and open(output, encoding="utf-8").read() == full
+
+    (tree / "pkg" / "a.py").write_text("print('a2')\n")
+    (tree / "pkg" / "b.py").unlink()
+    (tree / "pkg" / "c.py").write_text("print('c')\n")
+    reads.clear()
+    generate_json_from_code(str(tree), output, incremental=True)
+
+    assert sorted(reads) == ["a.py", "c.py"]
+    assert load(output) == {
+        os.path.join("pkg", "a.py"): "print('a2')\n",
+        os.path.join("pkg", "c.py"): "print('c')\n",
+    }
+    manifest = json.load(open(manifest_path(output), encoding="utf-8"))["files"]
+    assert set(manifest) == {os.path.join("pkg", "a.py"), os.path.join("pkg", "c.py"), "logo.png"}
+    assert manifest["logo.png"]["sha256"] is None  # binary: remembered, never exported
+
+
+def test_incremental_export_matches_a_full_export(tree, tmp_path):
+    incremental, full = str(tmp_path / "inc.json"), str(tmp_path / "full.json")
+    generate_json_from_code(str(tree), incremental, incremental=True)
+    (tree / "pkg" / "a.py").write_text("print('changed')\n")
+    os.utime(tree / "pkg" / "b.py")  # touched, same content
+
+    generate_json_from_code(str(tree), incremental, incremental=True)
+    generate_json_from_code(str(tree), full)
+
+    assert open(incremental, encoding="utf-8").read() == open(full, encoding="utf-8").read()
+
+
+def test_parallel_export_streams_json_dump_layout_in_scan_order(tree, tmp_path, monkeypatch):
+    for i in range(40):
+        (tree / "pkg" / f"m{i}.py").write_text(f"name = 'é{i}'\n\"quoted\"\t\\\n")
+    monkeypatch.setattr(code_mapper, "READ_BATCH", 3)  # many batches in flight
+    output = tmp_path / "structure.json"
+
+    generate_json_from_code(str(tree), str(output), workers=4)
+
+    text = output.read_text(encoding="utf-8")
+    data = json.loads(text)
+    assert text == json.dumps(data, indent=2, ensure_ascii=False)
+    walked = [
+        os.path.relpath(os.path.join(dirpath, name), tree)
+        for dirpath, _, names in os.walk(tree)
+        for name in names
+        if name.endswith(".py") and "build" not in dirpath
+    ]
+    assert [item["path"] for item in data["files"]] == walked
+
+
+def test_export_translates_newlines_like_a_text_read(tree, tmp_path):
+    (tree / "pkg" / "win.py").write_bytes(b"a\r\nb\r\n")
+    (tree / "pkg" / "mac.py").write_bytes(b"a\rb\r")
+    output = str(tmp_path / "structure.json")
+
+    generate_json_from_code(str(tree), output)
+
+    files = load(output)
+    assert files[os.path.join("pkg", "win.py")] == "a\nb\n"
+    assert files[os.path.join("pkg", "mac.py")] == "a\nb\n"
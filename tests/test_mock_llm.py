@@ -0,0 +1,130 @@
+import asyncio
+import json
+import uuid
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from apps.architect.agents.nodes.analyst import AnalystAgent
+from apps.architect.agents.nodes.pm import PMAgent
+from apps.architect.dao.ollama_admin import ModelKeeper
+from apps.architect.domain.config import config
+from apps.architect.domain.models import CadrageReport, TechnicalSpec
+from libs.mock_llm import MockProfile, create_app
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+def chat(schema: dict, stream: bool = False) -> dict:
+    return {
+        "model": "qwen3:0.6b",
+        "messages": [{"role": "user", "content": "Build a CRM"}],
+        "response_format": {"type": "json_schema", "json_schema": {"name": "out", "schema": schema}},
+        "stream": stream,
+    }
+
+
+def test_native_output_matches_schema():
+    schema = TypeAdapter(List[TechnicalSpec]).json_schema()
+    client = TestClient(create_app())
+
+    body = client.post("/v1/chat/completions", json=chat(schema)).json()
+
+    specs = TypeAdapter(List[TechnicalSpec]).validate_json(body["choices"][0]["message"]["content"])
+    assert specs and body["usage"]["completion_tokens"] > 0
+
+
+def test_streaming_reassembles_valid_json():
+    client = TestClient(create_app())
+
+    with client.stream("POST", "/v1/chat/completions", json=chat(CadrageReport.model_json_schema(), True)) as r:
+        events = [line[6:] for line in r.iter_lines() if line.startswith("data: ")]
+
+    content = "".join(
+        choice["delta"].get("content") or ""
+        for event in events[:-1]
+        for choice in json.loads(event)["choices"]
+    )
+    assert events[-1] == "[DONE]"
+    CadrageReport.model_validate_json(content)
+
+
+def test_error_profile_returns_server_errors():
+    client = TestClient(create_app(MockProfile(ttft_s=0, tokens_per_s=0, error_rate=1.0)))
+
+    assert client.post("/v1/chat/completions", json=chat({"type": "object"})).status_code == 503
+
+
+async def test_agents_run_offline_against_mock(mock_llm_url, monkeypatch):
+    monkeypatch.setattr(config, "OLLAMA_URL", mock_llm_url)
+
+    report = await AnalystAgent().analyze("The client wants a CRM.")
+    charter = await PMAgent().check_requirements("The client wants a CRM.")
+
+    assert isinstance(report, CadrageReport)
+    assert charter.content == "The client wants a CRM."
+
+
+@pytest.fixture
+def keeper_config(mock_llm_url, monkeypatch):
+    monkeypatch.setattr(config, "OLLAMA_URL", mock_llm_url)
+    # Model names of this test only: the session mock keeps its residency across tests
+    test_id = uuid.uuid4().hex[:8]
+    monkeypatch.setattr(config, "SMALL_MODEL", f"keeper-small-{test_id}")
+    monkeypatch.setattr(config, "LARGE_MODEL", f"keeper-large-{test_id}")
+    return config
+
+
+async def wait_pinned(keeper: ModelKeeper) -> None:
+    for _ in range(200):
+        if keeper.pinned:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_model_keeper_pins_releases_and_reloads(keeper_config, monkeypatch):
+    monkeypatch.setattr(keeper_config, "OLLAMA_WARMUP", True)
+    keeper = ModelKeeper()
+    await keeper.start()
+    try:
+        await wait_pinned(keeper)
+        pinned = await keeper.status()
+
+        await keeper.release()
+        released = await keeper.status()
+
+        keeper.touch()  # traffic is back: reloaded in the background
+        await wait_pinned(keeper)
+        reloaded = await keeper.status()
+    finally:
+        await keeper.stop()
+
+    assert pinned["pinned"] and set(pinned["models"]) == {config.SMALL_MODEL_NAME, config.MODEL_NAME}
+    assert all(m["resident"] and m["expires_at"] is None for m in pinned["models"].values())
+    assert not released["pinned"]
+    assert not any(m["resident"] for m in released["models"].values())
+    assert reloaded["pinned"] and all(m["resident"] for m in reloaded["models"].values())
+
+
+async def test_model_keeper_pins_nothing_without_warmup(keeper_config, monkeypatch):
+    monkeypatch.setattr(keeper_config, "OLLAMA_WARMUP", False)
+    keeper = ModelKeeper()
+    await keeper.start()
+    try:
+        keeper.touch()
+        await asyncio.sleep(0.2)
+        status = await keeper.status()
+    finally:
+        await keeper.stop()
+
+    assert not status["pinned"]
+    assert not any(m["resident"] for m in status["models"].values())
@@ -1,8 +1,24 @@
 import pytest
+import asyncio
+import json
 import os
+import time
 import yaml
 import httpx
 import socket
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from apps.architect.api.loop_monitor import LoopMonitor
+from apps.architect.api.metrics import render_metrics
+from apps.architect.api.observability import SpanStats
+from apps.architect.api.span_export import (
+    BatchingSpanProcessor,
+    OTLPJsonFileExporter,
+    TailSamplingSpanProcessor,
+)
 from conftest import app_offline
 
 
@@ -74,3 +90,96 @@ async def test_requirement_otlp_port_open(obs_env):
     sock.close()
 
     assert result == 0, f"OTLP Collector port {port} is closed on {host}."
+
+
+# --- Span export pipeline (offline) ---
+
+class StuckExporter(SpanExporter):
+    """Collector that hangs, then fails: as an unreachable Phoenix."""
+
+    def export(self, spans):
+        time.sleep(0.5)
+        return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+
+def test_span_export_never_blocks_and_falls_back_to_file(tmp_path):
+    stats = SpanStats()
+    fallback = OTLPJsonFileExporter(str(tmp_path / "spans.jsonl"))
+    processor = BatchingSpanProcessor(
+        StuckExporter(), fallback, queue_size=10, batch_size=5, flush_s=0.05, stats=stats
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+
+    start = time.perf_counter()
+    for i in range(100):
+        with tracer.start_as_current_span(f"span-{i}"):
+            pass
+    elapsed = time.perf_counter() - start
+    provider.shutdown()
+
+    assert elapsed < 0.25
+    assert stats.dropped > 0
+    assert stats.written + stats.dropped == 100 and stats.exported == 0
+    lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+    written = sum(
+        len(scope["spans"])
+        for line in lines
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+    )
+    assert written == stats.written
+
+
+def test_tail_sampling_keeps_only_slow_or_failed_traces():
+    stats = SpanStats()
+    exported = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(TailSamplingSpanProcessor(
+        SimpleSpanProcessor(exported), sample_rate=0.0, slow_s=0.1, max_attribute_chars=10, stats=stats
+    ))
+    tracer = provider.get_tracer("test")
+
+    with tracer.start_as_current_span("fast"):
+        with tracer.start_as_current_span("llm", attributes={"input.value": "x" * 100}):
+            pass
+    with tracer.start_as_current_span("failed"):
+        with tracer.start_as_current_span("llm", attributes={"input.value": "x" * 100}) as llm:
+            llm.set_status(Status(StatusCode.ERROR))
+    with tracer.start_as_current_span("slow"):
+        time.sleep(0.15)
+
+    spans = exported.get_finished_spans()
+    assert sorted(span.name for span in spans) == ["failed", "llm", "slow"]
+    assert stats.sampled_out == 2
+    llm = next(span for span in spans if span.name == "llm")
+    assert llm.attributes["input.value"] == "xxxxxxxxxx... [90 chars truncated]"
+
+
+# --- Event loop monitor ---
+
+def blocking_work(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_loop_monitor_reports_the_blocking_call(caplog):
+    monitor = LoopMonitor(interval_s=0.02, threshold_s=0.1)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level("WARNING", logger="apps.architect.api.loop_monitor"):
+            blocking_work(0.4)
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    reports = [r.getMessage() for r in caplog.records if "Event loop blocked" in r.getMessage()]
+    assert len(reports) == 1  # one report per blocking episode
+    # The innermost non-stdlib frame is reported, not time.sleep
+    assert "test_observability (from" in reports[0] and "blocking_work" in reports[0]
+    assert monitor.max_lag_s >= 0.3
+    assert "architect_event_loop_lag_seconds_count" in render_metrics().decode()
@@ -0,0 +1,646 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from starlette.requests import Request
+
+from apps.architect.agents import orchestrator
+from apps.architect.api.admission import OVERLOADED, RATE_LIMITED, AdmissionController, AdmissionRejected, client_key
+from apps.architect.api.batch import BatchRunner
+from apps.architect.api.jobs import JobManager
+from apps.architect.dao.job_store import SqliteJobStore
+from apps.architect.api import controller as controller_module
+from apps.architect.api.controller import ArchitectController
+from apps.architect.api.metrics import render_metrics
+from apps.architect.domain.config import config
+from apps.architect.dao.checkpoints import checkpoints
+from apps.architect.dao.rate_limits import SharedTokenBuckets
+from apps.architect.dao.node_cache import NodeCache, SharedNodeCache, node_cache
+from apps.architect.dao.run_history import RunHistory
+from apps.architect.domain.models import CadrageReport
+from apps.architect.dto.contracts import ArchitectureRequest, BatchItem, PMAnalysisReport
+from apps.architect.dto.states import BatchResultDTO
+from apps.architect.ui.diagram import WorkflowDiagram
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+LLM_DELAY = 0.2
+
+
+class FakePMAgent:
+    """Offline PM agent with a fixed LLM-like latency."""
+    calls = 0
+
+    async def check_requirements(self, requirements: str) -> PMAnalysisReport:
+        FakePMAgent.calls += 1
+        await asyncio.sleep(LLM_DELAY)
+        return PMAnalysisReport(is_smart=True, content=requirements)
+
+    async def fill_gaps_with_hypotheses(self, report: PMAnalysisReport):
+        return []
+
+
+class FakeAnalystAgent:
+    calls = 0
+
+    async def analyze(self, cdc_text: str) -> CadrageReport:
+        FakeAnalystAgent.calls += 1
+        await asyncio.sleep(LLM_DELAY)
+        return CadrageReport(
+            needs=[cdc_text], constraints=[], actors=[], risks=[], clarification_questions=[]
+        )
+
+
+@pytest.fixture
+def offline_agents(monkeypatch, tmp_path):
+    monkeypatch.setattr(checkpoints, "directory", tmp_path / "checkpoints")
+    monkeypatch.setattr(controller_module, "run_history", RunHistory(str(tmp_path / "history.db")))
+    monkeypatch.setattr(controller_module, "admission", AdmissionController(max_concurrent=8))
+    monkeypatch.setattr(FakePMAgent, "calls", 0)
+    monkeypatch.setattr(FakeAnalystAgent, "calls", 0)
+    node_cache.clear()
+    monkeypatch.setattr(orchestrator, "PMAgent", FakePMAgent)
+    monkeypatch.setattr(orchestrator, "AnalystAgent", FakeAnalystAgent)
+
+
+async def test_pm_and_analyst_run_concurrently(offline_agents):
+    controller = ArchitectController()
+
+    start = time.perf_counter()
+    result = await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+    elapsed = time.perf_counter() - start
+
+    assert result.analysis_report.needs == ["A CRM"]
+    assert result.final_code is not None
+    assert elapsed < 2 * LLM_DELAY
+
+
+async def test_graph_without_deps_analyzes_once(offline_agents):
+    result = await orchestrator.app_workflow.run(
+        orchestrator.PMNode(), state=orchestrator.AgentState(requirements="A CRM")
+    )
+
+    assert result.state.analysis_report.needs == ["A CRM"]
+    assert FakeAnalystAgent.calls == 1
+
+
+async def test_pipeline_metrics_are_exposed(offline_agents):
+    await ArchitectController().run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+
+    text = render_metrics().decode()
+
+    assert 'architect_pipeline_runs_total{status="success"}' in text
+    assert 'architect_node_duration_seconds_count{node="ReviewerNode"}' in text
+    assert "architect_runs_in_flight 0.0" in text
+
+
+async def test_batch_streams_results_and_resumes(offline_agents, tmp_path):
+    source = tmp_path / "requirements.jsonl"
+    output = tmp_path / "results.jsonl"
+    source.write_text(
+        "\n".join(json.dumps({"id": f"req-{i}", "requirements": f"CRM {i}"}) for i in range(4)) + "\n"
+    )
+    runner = BatchRunner(concurrency=4)
+
+    start = time.perf_counter()
+    assert await runner.run_file(str(source), str(output)) == 4
+    elapsed = time.perf_counter() - start
+
+    lines = [BatchResultDTO.model_validate_json(line) for line in output.read_text().splitlines()]
+    assert {r.id for r in lines if r.status == "ok"} == {f"req-{i}" for i in range(4)}
+    assert elapsed < 4 * LLM_DELAY
+    # Everything completed: a rerun resumes with nothing left to do
+    assert await runner.run_file(str(source), str(output)) == 0
+
+
+async def test_batch_resume_drops_a_truncated_last_line(offline_agents, tmp_path):
+    source = tmp_path / "requirements.jsonl"
+    output = tmp_path / "results.jsonl"
+    source.write_text("\n".join(json.dumps({"id": f"req-{i}", "requirements": f"CRM {i}"}) for i in range(2)))
+    runner = BatchRunner(concurrency=2)
+    await runner.run_file(str(source), str(output))
+    # Interrupted in the middle of writing the second result
+    lines = output.read_text().splitlines()
+    output.write_text(lines[0] + "\n" + lines[1][: len(lines[1]) // 2])
+
+    assert await runner.run_file(str(source), str(output)) == 1
+
+    results = [BatchResultDTO.model_validate_json(line) for line in output.read_text().splitlines()]
+    assert sorted(r.id for r in results) == ["req-0", "req-1"]
+    assert await runner.run_file(str(source), str(output)) == 0
+
+
+async def test_batch_never_resumes_another_batch_checkpoint(offline_agents, monkeypatch):
+    runner = BatchRunner(concurrency=1)
+    item_a = BatchItem(id="1", requirements="Batch A: payroll system")
+    item_b = BatchItem(id="1", requirements="Batch B: CRM")
+    assert runner.run_id(item_a) != runner.run_id(item_b)
+    assert BatchRunner().run_id(item_a) != runner.run_id(item_a)  # concurrent batches
+
+    async def broken_engineer(self, ctx):
+        raise RuntimeError("engineer down")
+
+    # A stale checkpoint of other requirements under the item's run id
+    with monkeypatch.context() as patch:
+        patch.setattr(orchestrator.EngineerNode, "run", broken_engineer)
+        with pytest.raises(RuntimeError):
+            await runner.controller.run_full_pipeline(
+                ArchitectureRequest(requirements=item_a.requirements), run_id=runner.run_id(item_b)
+            )
+
+    result = await runner._run_one(item_b)
+
+    assert result.status == "ok"
+    assert result.result.requirements == "Batch B: CRM"
+    assert not checkpoints.exists(runner.run_id(item_b))
+
+
+async def test_failed_run_resumes_at_the_failed_node(offline_agents, monkeypatch):
+    controller = ArchitectController()
+
+    async def broken_engineer(self, ctx):
+        raise RuntimeError("engineer down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(orchestrator.EngineerNode, "run", broken_engineer)
+        with pytest.raises(RuntimeError):
+            await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM"), run_id="crm")
+    assert checkpoints.exists("crm")
+
+    result = await controller.resume_pipeline("crm")
+
+    assert FakePMAgent.calls == 1  # PM and Analyst results came from the checkpoint
+    assert result.run_id == "crm"
+    assert result.analysis_report.needs == ["A CRM"]
+    assert result.final_code is not None
+    assert not checkpoints.exists("crm")
+
+
+async def test_rerun_only_recomputes_nodes_with_changed_inputs(offline_agents):
+    controller = ArchitectController()
+    first = await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+    assert first.reused_nodes == []
+
+    same = await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+    assert same.reused_nodes == ["PMNode", "AnalystNode", "ArchitectNode", "EngineerNode"]
+    # Typed outputs flow from the cache to the DTO without copies
+    assert same.analysis_report is first.analysis_report
+    assert FakePMAgent.calls == 1
+
+    edited = await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM for shops"))
+    assert edited.recomputed_nodes == ["PMNode", "AnalystNode", "ArchitectNode"]
+    # The architecture specs did not change, so neither does the code
+    assert edited.reused_nodes == ["EngineerNode"]
+    assert 'architect_cache_requests_total{cache="node",result="hit"}' in render_metrics().decode()
+
+
+def test_node_cache_evicts_least_recently_used():
+    cache = NodeCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+
+    cache.put("c", {"v": 3})
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+
+
+def test_shared_node_cache_is_seen_by_every_worker(tmp_path):
+    state = str(tmp_path / "state.db")
+    first, second = SharedNodeCache(state, max_entries=2), SharedNodeCache(state, max_entries=2)
+    report = CadrageReport(needs=["CRM"], constraints=[], actors=[], risks=[], clarification_questions=[])
+
+    first.put("a", {"analysis_report": report})
+    first.put("b", {})
+    assert second.get("a") == {"analysis_report": report}
+    second.put("c", {})
+
+    assert "b" not in first
+    assert len(first) == 2
+
+
+def test_shared_node_cache_drops_entries_of_older_models(tmp_path):
+    cache = SharedNodeCache(str(tmp_path / "state.db"))
+    report = CadrageReport(needs=["CRM"], constraints=[], actors=[], risks=[], clarification_questions=[])
+    cache.put("current", {"analysis_report": report})
+    cache.put("old", {"analysis_report": report})
+    with cache._lock:
+        conn = cache._db()
+        with conn:
+            # A field the model requires today was missing when the entry was written
+            conn.execute(
+                "UPDATE node_cache SET value = ? WHERE key = 'old'",
+                (json.dumps({"analysis_report": {
+                    "model": "apps.architect.domain.models:CadrageReport", "value": {"needs": ["CRM"]}
+                }}),),
+            )
+            conn.execute("INSERT INTO node_cache VALUES ('pickled', ?, 0)", (b"\x80\x05garbage",))
+
+    assert cache.get("current") == {"analysis_report": report}
+    assert type(cache.get("current")["analysis_report"]) is CadrageReport
+    # Misses, recomputed by the node, and deleted
+    assert cache.get("old") is None and cache.get("pickled") is None
+    assert "old" not in cache and "pickled" not in cache
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+@pytest.fixture
+def stuck_engineer(monkeypatch):
+    """EngineerNode that hangs like an overloaded model; records its cancellation."""
+    events = []
+
+    async def hang(self, ctx):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    monkeypatch.setattr(orchestrator.EngineerNode, "run", hang)
+    return events
+
+
+async def test_deadline_returns_the_completed_nodes(offline_agents, stuck_engineer):
+    result = await ArchitectController().run_full_pipeline(
+        ArchitectureRequest(requirements="A CRM"), deadline_s=1.0, partial=True
+    )
+
+    assert result.partial
+    assert result.analysis_report.needs == ["A CRM"]
+    assert result.final_code is None
+    assert stuck_engineer == ["cancelled"]
+    assert checkpoints.exists(result.run_id)
+
+
+async def test_deadline_without_partial_result_fails(offline_agents, stuck_engineer):
+    with pytest.raises(TimeoutError):
+        await ArchitectController().run_full_pipeline(
+            ArchitectureRequest(requirements="A CRM"), deadline_s=0.5, partial=False
+        )
+
+
+async def test_cancelling_the_caller_stops_the_run(offline_agents, stuck_engineer):
+    task = asyncio.create_task(
+        ArchitectController().run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+    )
+    await asyncio.sleep(0.5)
+
+    start = time.perf_counter()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert time.perf_counter() - start < 1.0
+    assert stuck_engineer == ["cancelled"]
+    assert 'architect_pipeline_runs_total{status="cancelled"}' in render_metrics().decode()
+
+
+async def test_runs_are_stored_in_the_history(offline_agents):
+    result = await ArchitectController().run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+
+    record = controller_module.run_history.get(result.run_id)
+    assert record.status == "success"
+    assert record.result == result
+    assert [t.node for t in record.node_timings] == [
+        "PMNode", "AnalystNode", "ArchitectNode", "EngineerNode", "ReviewerNode"
+    ]
+
+    assert record.profile is None
+
+
+async def test_profiled_run_links_its_collapsed_stacks(offline_agents, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    result = await ArchitectController().run_full_pipeline(
+        ArchitectureRequest(requirements="A CRM", profile=True)
+    )
+
+    record = controller_module.run_history.get(result.run_id)
+    assert record.profile == str(tmp_path / "profiles" / f"{result.run_id}.folded")
+    stacks = dict(line.rsplit(" ", 1) for line in open(record.profile).read().splitlines())
+    # Waiting on the (fake) LLM call, seen through the run's await chain
+    waiting = [stack for stack in stacks if "FakePMAgent.check_requirements" in stack]
+    assert waiting and all(stack.startswith("[waiting];") for stack in waiting)
+    assert sum(int(count) for count in stacks.values()) > LLM_DELAY / config.PROFILE_INTERVAL_S / 2
+
+def test_workflow_diagram_is_built_once_and_served_from_disk(monkeypatch, tmp_path):
+    diagram = WorkflowDiagram(orchestrator.app_workflow, orchestrator.PMNode)
+    assert "PMNode --> AnalystNode" in diagram.mermaid
+    assert diagram.svg_url is None
+
+    calls = []
+    monkeypatch.setattr(orchestrator.app_workflow, "mermaid_code", lambda **kw: calls.append(kw))
+    assert diagram.mermaid is diagram.mermaid and calls == []
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    (tmp_path / "diagrams").mkdir()
+    (tmp_path / "diagrams" / f"{diagram.digest}.svg").write_bytes(b"<svg/>")
+    diagram.prerender()  # no mermaid.ink call: the rendered SVG is on disk
+
+    assert diagram.svg == b"<svg/>"
+    assert diagram.svg_url == f"/api/workflow/{diagram.digest}.svg"
+
+
+async def test_job_api_runs_in_background_and_streams_events(offline_agents):
+    jobs = JobManager(workers=2)
+    await jobs.start()
+    try:
+        job = await jobs.submit(ArchitectureRequest(requirements="A CRM"))
+        assert job.status == "queued"
+
+        events = [event async for event in jobs.events(job.run_id)]
+    finally:
+        await jobs.stop()
+
+    assert job.status == "success" and job.result.final_code is not None
+    names = [e["event"] for e in events]
+    assert names[:2] == ["queued", "run-started"] and names[-1] == "run-finished"
+    finished = [e["node"] for e in events if e["event"] == "node-finished"]
+    assert finished == ["PMNode", "AnalystNode", "ArchitectNode", "EngineerNode", "ReviewerNode"]
+    assert [e["id"] for e in events] == list(range(len(events)))
+
+
+async def test_job_api_cancels_a_running_job(offline_agents, stuck_engineer):
+    jobs = JobManager(workers=1)
+    await jobs.start()
+    try:
+        job = await jobs.submit(ArchitectureRequest(requirements="A CRM"))
+        await asyncio.sleep(0.5)
+        assert await jobs.cancel(job.run_id)
+        events = [event async for event in jobs.events(job.run_id, after=1)]
+
+        # The worker survived the cancellation and takes the next job
+        other = await jobs.submit(ArchitectureRequest(requirements="Another CRM"))
+        await asyncio.sleep(0.1)
+        assert other.status == "running"
+    finally:
+        await jobs.stop()
+
+    assert job.status == "cancelled"
+    assert events[-1]["status"] == "cancelled"
+    assert stuck_engineer[0] == "cancelled"
+
+
+async def test_job_pool_stop_waits_for_runs_to_unwind(offline_agents, stuck_engineer):
+    jobs = JobManager(workers=1)
+    await jobs.start()
+    job = await jobs.submit(ArchitectureRequest(requirements="A CRM"))
+    await asyncio.sleep(0.5)
+
+    await jobs.stop()
+
+    # Cancelled, recorded and archived before stop() returns
+    assert stuck_engineer == ["cancelled"]
+    assert job.status == "cancelled"
+    assert controller_module.run_history.get(job.run_id).status == "cancelled"
+
+
+async def test_job_worker_survives_a_store_failure(offline_agents, monkeypatch):
+    jobs = JobManager(workers=1)
+    finish = jobs.store.finish
+    failures = []
+
+    def flaky_finish(job):
+        if not failures or failures[0] == job.run_id:  # the first run is never recorded
+            failures.append(job.run_id)
+            raise RuntimeError("database is locked")
+        return finish(job)
+
+    monkeypatch.setattr(jobs.store, "finish", flaky_finish)
+    await jobs.start()
+    try:
+        first = await jobs.submit(ArchitectureRequest(requirements="A CRM"))
+        while not failures:
+            await asyncio.sleep(0.05)
+        # The worker is still there and records the next run
+        second = await jobs.submit(ArchitectureRequest(requirements="Another CRM"))
+        async with asyncio.timeout(10):
+            events = [event async for event in jobs.events(second.run_id)]
+    finally:
+        await jobs.stop()
+
+    assert set(failures) == {first.run_id}
+    assert events[-1]["event"] == "run-finished" and events[-1]["status"] == "success"
+
+
+@pytest.fixture
+def shared_workers(tmp_path):
+    """Two managers on one SQLite state, as two worker processes: front queues, back runs."""
+    state = str(tmp_path / "state.db")
+    return (
+        JobManager(workers=1, store=SqliteJobStore(state, poll_s=0.05, poll_max_s=0.2)),
+        JobManager(workers=1, store=SqliteJobStore(state, poll_s=0.05, poll_max_s=0.2)),
+    )
+
+
+async def test_jobs_are_tracked_across_workers(offline_agents, shared_workers):
+    front, back = shared_workers
+    await back.start()
+    try:
+        job = await front.submit(ArchitectureRequest(requirements="A CRM"))
+        events = [event async for event in front.events(job.run_id)]
+    finally:
+        await back.stop()
+
+    done = await front.get(job.run_id)
+    assert done.status == "success" and done.result.final_code is not None
+    assert events[-1]["event"] == "run-finished"
+    assert sum(e["event"] == "node-finished" for e in events) == 5
+
+
+async def test_sqlite_job_store_stays_off_the_event_loop(offline_agents, shared_workers, monkeypatch):
+    front, back = shared_workers
+    loop_thread, store_threads = threading.get_ident(), set()
+    for manager in shared_workers:
+        for name in ("add", "get", "publish", "finish", "events_after", "_claim_one"):
+            method = getattr(manager.store, name)
+
+            def spy(*args, method=method):
+                store_threads.add(threading.get_ident())
+                return method(*args)
+
+            monkeypatch.setattr(manager.store, name, spy)
+    await back.start()
+    try:
+        job = await front.submit(ArchitectureRequest(requirements="A CRM"))
+        events = [event async for event in front.events(job.run_id)]
+    finally:
+        await back.stop()
+
+    assert events[-1]["status"] == "success"
+    assert store_threads and loop_thread not in store_threads
+
+
+async def test_jobs_are_cancelled_across_workers(offline_agents, stuck_engineer, shared_workers):
+    front, back = shared_workers
+    await back.start()
+    try:
+        job = await front.submit(ArchitectureRequest(requirements="A CRM"))
+        while (await front.get(job.run_id)).status != "running":
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.5)
+
+        assert await front.cancel(job.run_id)
+        events = [event async for event in front.events(job.run_id)]
+    finally:
+        await back.stop()
+
+    assert (await front.get(job.run_id)).status == "cancelled"
+    assert events[-1]["status"] == "cancelled"
+    assert stuck_engineer == ["cancelled"]
+
+
+async def test_queued_job_is_cancelled_with_its_last_event(shared_workers):
+    front, _ = shared_workers  # no worker running: the job stays queued
+    job = await front.submit(ArchitectureRequest(requirements="A CRM"))
+
+    assert await front.cancel(job.run_id)
+
+    # The status and the run-finished event are written together
+    assert (await front.get(job.run_id)).status == "cancelled"
+    events = [event async for event in front.events(job.run_id)]
+    assert [e["event"] for e in events] == ["queued", "run-finished"]
+    assert events[-1]["status"] == "cancelled"
+
+
+async def test_jobs_of_a_dead_worker_fail_when_their_lease_expires(tmp_path):
+    state = str(tmp_path / "state.db")
+    dead = SqliteJobStore(state, lease_s=0.3)
+    alive = JobManager(workers=1, store=SqliteJobStore(state, poll_s=0.05, lease_s=0.3))
+    job = await alive.submit(ArchitectureRequest(requirements="A CRM"))
+    claimed = dead._claim_one()  # claimed, then its worker never renews the lease
+
+    await alive.start()
+    try:
+        events = [event async for event in alive.events(job.run_id)]
+    finally:
+        await alive.stop()
+
+    lost = await alive.get(job.run_id)
+    assert lost.status == "failed" and lost.error == "worker lost"
+    assert events[-1]["event"] == "run-finished" and events[-1]["status"] == "failed"
+    # A late finish of the dead worker is not recorded over it
+    claimed.status, claimed.finished_at = "success", time.time()
+    assert not dead.finish(claimed)
+    assert (await alive.get(job.run_id)).status == "failed"
+
+
+@pytest.mark.parametrize(
+    "hops, forwarded, client",
+    [
+        (1, None, "10.0.0.9"),  # no proxy: the peer
+        (1, "203.0.113.7", "203.0.113.7"),  # set by the proxy
+        (1, "1.2.3.4, 203.0.113.7", "203.0.113.7"),  # spoofed first entry ignored
+        (2, "1.2.3.4, 203.0.113.7, 10.0.0.2", "203.0.113.7"),
+        (2, "203.0.113.7", "10.0.0.9"),  # fewer hops than trusted proxies
+        (0, "203.0.113.7", "10.0.0.9"),
+    ],
+)
+def test_client_key_trusts_only_the_proxy_hops(monkeypatch, hops, forwarded, client):
+    monkeypatch.setattr(config, "TRUSTED_PROXY_HOPS", hops)
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    request = Request({"type": "http", "headers": headers, "client": ("10.0.0.9", 50000)})
+
+    assert client_key(request) == client
+
+
+async def test_admission_rate_limits_each_client():
+    admission = AdmissionController(rate_per_min=60, burst=2)
+
+    await admission.check("alice")
+    await admission.check("alice")
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.check("alice")
+    await admission.check("bob")  # buckets are per client
+
+    assert rejected.value.reason == RATE_LIMITED
+    assert rejected.value.retry_after_s == 1
+
+
+async def test_admission_is_shared_by_the_workers(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "WORKERS", 2)
+    monkeypatch.setattr(config, "MAX_CONCURRENT_RUNS", 4)
+    state = str(tmp_path / "state.db")
+    # Two worker processes on one state database
+    workers = [
+        AdmissionController(rate_per_min=60, burst=2, shared_buckets=SharedTokenBuckets(state))
+        for _ in range(2)
+    ]
+
+    assert [worker.max_concurrent for worker in workers] == [2, 2]
+    await workers[0].check("alice")
+    await workers[1].check("alice")
+    with pytest.raises(AdmissionRejected) as rejected:
+        await workers[0].check("alice")  # the bucket is the same on every worker
+    await workers[1].check("bob")
+
+    assert rejected.value.reason == RATE_LIMITED
+    assert rejected.value.retry_after_s == 1
+
+
+async def test_admission_caps_runs_and_sheds_load(offline_agents, monkeypatch):
+    admission = AdmissionController(max_concurrent=1, rate_per_min=0, max_wait_s=1.0)
+    admission.run_estimate_s = 10.0
+    monkeypatch.setattr(controller_module, "admission", admission)
+    controller = ArchitectController()
+
+    start = time.perf_counter()
+    runs = [
+        asyncio.create_task(controller.run_full_pipeline(ArchitectureRequest(requirements=f"CRM {i}")))
+        for i in range(2)
+    ]
+    await asyncio.sleep(LLM_DELAY / 2)
+    assert (admission.running, admission.waiting) == (1, 1)
+    # The queued run is waiting, not executing
+    text = render_metrics().decode()
+    assert "architect_runs_in_flight 1.0" in text and "architect_runs_waiting 1.0" in text
+
+    # Two runs ahead of a single slot: the estimated wait is over the threshold
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.check("carol")
+    assert rejected.value.reason == OVERLOADED
+    assert rejected.value.retry_after_s == 19
+
+    results = await asyncio.gather(*runs)
+    assert time.perf_counter() - start >= 2 * LLM_DELAY
+    # Durations exclude the wait for the slot
+    durations = [controller_module.run_history.get(r.run_id).duration_s for r in results]
+    assert max(durations) < 1.5 * LLM_DELAY
+    assert admission.run_estimate_s < 10.0
+    await admission.check("carol")
+    assert 'architect_admission_rejections_total{reason="overloaded"}' in render_metrics().decode()
+
+
+def test_app_modules_defer_the_llm_and_tracing_stacks():
+    loaded = subprocess.run(
+        [sys.executable, "-c", (
+            "import sys, apps.architect.api.controller, apps.architect.api.observability;"
+            "print(sorted({'pydantic_ai', 'openai', 'opentelemetry.sdk'} & set(sys.modules)))"
+        )],
+        capture_output=True, text=True, check=True,
+    )
+    assert loaded.stdout.strip() == "[]"
+
+
+async def test_agents_are_built_once_and_shared_by_runs(offline_agents, monkeypatch):
+    monkeypatch.setattr(orchestrator, "_agents", {})
+    controller = ArchitectController()
+
+    await controller.run_full_pipeline(ArchitectureRequest(requirements="A CRM"))
+    agents = dict(orchestrator._agents)
+    await controller.run_full_pipeline(ArchitectureRequest(requirements="Another CRM"))
+
+    assert set(agents) == {FakePMAgent, FakeAnalystAgent, orchestrator.ArchitectAgent, orchestrator.EngineerAgent}
+    assert orchestrator._agents == agents
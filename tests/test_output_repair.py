@@ -0,0 +1,84 @@
+from typing import List
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from apps.architect.dao.output_repair import RepairingModel, repair_json, repair_stats
+from apps.architect.domain.models import TechnicalSpec
+from apps.architect.dto.contracts import PMAnalysisReport
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    repair_stats.reset()
+    yield
+    repair_stats.reset()
+
+
+def test_repair_strips_fences_and_trailing_commas():
+    value, repaired = repair_json('```json\n{"gaps": ["budget",],}\n```', None)
+
+    assert repaired is True
+    assert value == {"gaps": ["budget"]}
+
+
+def test_repair_coerces_near_miss_types():
+    schema = PMAnalysisReport.model_json_schema()
+
+    value, repaired = repair_json('{"is_smart": "no", "gaps": "No deadline"}', schema)
+
+    assert repaired is True
+    assert value == {"is_smart": False, "gaps": ["No deadline"], "hypotheses": [], "content": ""}
+
+
+async def test_malformed_tool_call_is_repaired_without_retry():
+    def sloppy_model(messages, info) -> ModelResponse:
+        return ModelResponse(parts=[
+            ToolCallPart(info.output_tools[0].name, '```json\n{"is_smart": "yes",}\n```')
+        ])
+
+    agent = Agent(RepairingModel(FunctionModel(sloppy_model)), output_type=PMAnalysisReport)
+    result = await agent.run("Build a CRM")
+
+    assert result.output.is_smart is True
+    assert repair_stats.snapshot() == {"responses": 1, "repaired": 1, "retries": 0}
+
+
+async def test_json_text_instead_of_tool_call_is_converted():
+    def chatty_model(messages, info) -> ModelResponse:
+        return ModelResponse(parts=[TextPart(
+            '{"response": [{"title": "Auth", "description": "OIDC login", "priority": "Must"}]}'
+        )])
+
+    agent = Agent(RepairingModel(FunctionModel(chatty_model)), output_type=List[TechnicalSpec])
+    result = await agent.run("Specs")
+
+    assert result.output[0].title == "Auth"
+    assert repair_stats.retries == 0
+
+
+async def test_unrepairable_output_falls_back_to_retry():
+    calls = []
+
+    def learning_model(messages, info) -> ModelResponse:
+        calls.append(info)
+        if len(calls) == 1:
+            return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, '{"is_smart": [1, 2]}')])
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, '{"is_smart": true}')])
+
+    agent = Agent(RepairingModel(FunctionModel(learning_model)), output_type=PMAnalysisReport, retries=2)
+    result = await agent.run("Build a CRM")
+
+    assert result.output.is_smart is True
+    assert repair_stats.retries == 1
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.usage import RunUsage
+
+from apps.architect.agents import routing
+from apps.architect.agents.routing import TieredAgent, latency_tracker
+from apps.architect.domain.config import config, SMALL_TIER, LARGE_TIER
+from apps.architect.dto.contracts import PMAnalysisReport
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+def broken_model(messages, info) -> ModelResponse:
+    """Small model stand-in that never produces a valid tool call."""
+    return ModelResponse(parts=[TextPart("is_smart: maybe")])
+
+
+def valid_model(messages, info) -> ModelResponse:
+    payload = {"is_smart": True, "content": "ok"}
+    if info.model_request_parameters.output_mode == "native":
+        return ModelResponse(parts=[TextPart(json.dumps(payload))])
+    return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, payload)])
+
+
+@pytest.fixture(params=["native", "tool"])
+def tiers(monkeypatch, request):
+    monkeypatch.setattr(config, "STRUCTURED_OUTPUT", request.param)
+    models = {"small-model": broken_model, "large-model": valid_model}
+    monkeypatch.setattr(config, "SMALL_MODEL", "small-model")
+    monkeypatch.setattr(config, "LARGE_MODEL", "large-model")
+    monkeypatch.setattr(routing, "get_llm_model", lambda name: FunctionModel(models[name]))
+    latency_tracker.reset()
+    yield
+    latency_tracker.reset()
+
+
+def test_task_profiles_resolve_tiers():
+    assert config.tier_for("pm.check_requirements") == SMALL_TIER
+    assert config.tier_for("analyst.analyze") == LARGE_TIER
+    assert config.tier_for("unknown.task") == LARGE_TIER
+
+
+async def test_small_tier_escalates_on_invalid_output(tiers):
+    agent = TieredAgent(
+        task="pm.check_requirements",
+        output_type=PMAnalysisReport,
+        instructions="Check requirements.",
+    )
+
+    report = await agent.run("Build a website")
+
+    assert report.is_smart is True
+    steps = {s["tier"]: s for s in latency_tracker.report()}
+    assert steps[SMALL_TIER]["failures"] == 1
+    assert steps[LARGE_TIER]["calls"] == 1
+    assert steps[LARGE_TIER]["retry_rate"] == 0
+
+
+def test_native_mode_drops_schema_hint(monkeypatch):
+    monkeypatch.setattr(config, "STRUCTURED_OUTPUT", "native")
+    monkeypatch.setattr(routing, "get_llm_model", lambda name: FunctionModel(valid_model))
+    agent = TieredAgent(
+        task="analyst.analyze",
+        output_type=PMAnalysisReport,
+        instructions="Analyze.",
+        schema_hint="Output MUST be JSON.",
+    )
+
+    assert agent._agent(LARGE_TIER)._instructions == ["Analyze."]
+
+
+def test_run_usage_reads_the_method_and_the_property():
+    usage = RunUsage(requests=1, input_tokens=3, output_tokens=5)
+
+    class MethodResult:  # pydantic-ai 1.x
+        def usage(self):
+            return usage
+
+    class PropertyResult:
+        @property
+        def usage(self):
+            return usage
+
+    assert routing._run_usage(MethodResult()) is usage
+    assert routing._run_usage(PropertyResult()) is usage
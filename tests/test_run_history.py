@@ -0,0 +1,116 @@
+import gc
+import time
+
+import pytest
+
+from apps.architect.dao.run_history import RunHistory, requirements_hash
+from apps.architect.domain.models import SOLIDCode
+from apps.architect.dto.states import AgentStateDTO
+
+import httpx
+from conftest import app_offline
+
+
+@pytest.mark.skipif(app_offline, reason="Apps don't listen 8080 port")
+def test_status(client: httpx.Client):
+    """Check if the UI is reachable."""
+    assert client.get("/api/status").status_code == 200
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = RunHistory(str(tmp_path / "history.db"))
+    yield store
+    store.close()
+
+
+def record(store: RunHistory, run_id: str, requirements: str = "A CRM", status: str = "success") -> None:
+    store.record(
+        run_id, status, requirements, "qwen3:0.6b", 1.5,
+        result=AgentStateDTO(
+            requirements=requirements,
+            final_code=SOLIDCode(class_name="Crm", methods={"run": "x" * 2000}, unit_tests={}),
+        ),
+        node_timings=[{"node": "PMNode", "duration_s": 0.5}],
+    )
+
+
+def test_get_returns_the_full_record(history):
+    record(history, "run-1")
+
+    stored = history.get("run-1")
+
+    assert stored.result.final_code.methods == {"run": "x" * 2000}
+    assert stored.node_timings[0].node == "PMNode"
+    assert stored.requirements_hash == requirements_hash("  A CRM\n")
+    assert history.get("unknown") is None
+
+
+def test_payloads_are_compressed(history):
+    record(history, "run-1")
+
+    size = history._db().execute("SELECT length(payload) FROM runs").fetchone()[0]
+
+    assert size < 500
+
+
+def test_listing_paginates_newest_first_with_filters(history):
+    for i in range(5):
+        record(history, f"run-{i}", requirements=f"CRM {i % 2}", status="failed" if i == 4 else "success")
+
+    page, cursor = history.list_runs(limit=2)
+    assert [r["run_id"] for r in page] == ["run-4", "run-3"]
+    page, cursor = history.list_runs(limit=2, before=cursor)
+    assert [r["run_id"] for r in page] == ["run-2", "run-1"]
+    page, cursor = history.list_runs(limit=2, before=cursor)
+    assert [r["run_id"] for r in page] == ["run-0"] and cursor is None
+
+    same_requirements, _ = history.list_runs(requirements_hash=requirements_hash("CRM 1"))
+    assert [r["run_id"] for r in same_requirements] == ["run-3", "run-1"]
+    failed, _ = history.list_runs(status="failed")
+    assert [r["run_id"] for r in failed] == ["run-4"]
+
+
+def test_deep_pages_stay_fast(history):
+    conn = history._db()
+    with conn:
+        conn.executemany(
+            "INSERT INTO runs (run_id, created_at, status, requirements_hash, model, duration_s, payload)"
+            " VALUES (?, ?, 'success', ?, 'm', 1.0, x'00')",
+            ((f"run-{i}", float(i), f"h{i % 100}") for i in range(100_000)),
+        )
+
+    gc.collect()  # a collection pause of the whole test session is not the query's cost
+    start = time.perf_counter()
+    page, cursor = history.list_runs(limit=50, before=10, requirements_hash="h1")
+    history.list_runs(limit=50, before=50_000)
+    elapsed = time.perf_counter() - start
+
+    assert [r["run_id"] for r in page] == ["run-1"] and cursor is None
+    assert elapsed < 0.05
+
+
+def test_time_range_filter_pages_through_the_window(history):
+    conn = history._db()
+    with conn:
+        conn.executemany(
+            "INSERT INTO runs (run_id, created_at, status, requirements_hash, model, duration_s, payload)"
+            " VALUES (?, ?, 'success', 'h', 'm', 1.0, x'00')",
+            ((f"run-{i}", float(i)) for i in range(100_000)),
+        )
+
+    gc.collect()
+    start = time.perf_counter()
+    page, cursor = history.list_runs(limit=3, since=50_000, until=50_005)
+    rest, end = history.list_runs(limit=3, before=cursor, since=50_000, until=50_005)
+    elapsed = time.perf_counter() - start
+
+    assert [r["run_id"] for r in page] == ["run-50004", "run-50003", "run-50002"]
+    assert [r["run_id"] for r in rest] == ["run-50001", "run-50000"] and end is None
+    assert [r["run_id"] for r in history.list_runs(limit=2, since=99_999)[0]] == ["run-99999"]
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT seq FROM runs WHERE created_at >= ? AND created_at < ? ORDER BY seq DESC",
+        (50_000, 50_005),
+    ))
+    assert "runs_by_time" in plan
+    assert elapsed < 0.05